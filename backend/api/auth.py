@@ -1,33 +1,61 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
+import orjson
 import sys
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once, re-imports must not grow sys.path)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from security.auth import (
-    UserCredentials, Token, User,
+    UserCredentials, User,
     login_user, logout_user, refresh_access_token,
+    authenticate_user, hash_password,
     get_current_user, require_admin, require_read,
     get_active_sessions, create_user, update_user_permissions, delete_user,
     users_db, security
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Static /permissions response, serialized once at import
+_PERMISSIONS_BYTES = orjson.dumps({
+    "permissions": {
+        "read": "View data and status",
+        "write": "Modify settings and parameters",
+        "control": "Control robot movement and navigation",
+        "terminal": "Access terminal interface",
+        "admin": "User management and system administration"
+    }
+})
+
+# Serialized /users response, rebuilt after any change to users_db
+_users_cache_bytes: Optional[bytes] = None
+
+def _invalidate_users_cache():
+    """Drop the cached /users response"""
+    global _users_cache_bytes
+    _users_cache_bytes = None
+
+# Permissions are validated by the models, unknown values are rejected with 422
+Permission = Literal["read", "write", "admin", "terminal", "control"]
 
 # Pydantic models
 class UserCreate(BaseModel):
     username: str
     password: str
-    permissions: List[str] = ["read"]
+    permissions: List[Permission] = ["read"]
 
 class UserUpdate(BaseModel):
-    permissions: List[str]
+    permissions: List[Permission]
 
 class PasswordChange(BaseModel):
     current_password: str
@@ -36,13 +64,14 @@ class PasswordChange(BaseModel):
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
-@router.post("/login", response_model=Token)
+@router.post("/login")
 async def login(credentials: UserCredentials):
     """
     Login with username and password
     """
     try:
-        token = login_user(credentials.username, credentials.password)
+        # Password hashing is CPU bound, keep it off the event loop
+        token = await run_in_threadpool(login_user, credentials.username, credentials.password)
         
         if not token:
             raise HTTPException(
@@ -51,8 +80,13 @@ async def login(credentials: UserCredentials):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # last_login changed
+        _invalidate_users_cache()
+        
         return token
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
@@ -91,30 +125,28 @@ async def refresh_token(request: RefreshTokenRequest):
             "token_type": "bearer"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Token refresh failed: {str(e)}")
 
-@router.get("/me", response_model=User)
+@router.get("/me")
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """
     Get current user information
     """
-    try:
-        username = current_user["username"]
-        user_data = users_db.get(username)
-        
-        if not user_data:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        return User(
-            username=user_data["username"],
-            permissions=user_data["permissions"],
-            created_at=user_data["created_at"],
-            last_login=user_data.get("last_login")
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get user info: {str(e)}")
+    username = current_user["username"]
+    user_data = users_db.get(username)
+    
+    if not user_data:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return User.model_construct(
+        username=user_data["username"],
+        permissions=user_data["permissions"],
+        created_at=user_data["created_at"],
+        last_login=user_data.get("last_login")
+    )
 
 @router.post("/change-password")
 async def change_password(
@@ -125,19 +157,18 @@ async def change_password(
     Change current user's password
     """
     try:
-        from security.auth import authenticate_user, hash_password
-        
         username = current_user["username"]
         
         # Verify current password
-        if not authenticate_user(username, password_change.current_password):
+        if not await run_in_threadpool(authenticate_user, username, password_change.current_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
         # Update password
-        users_db[username]["password_hash"] = hash_password(password_change.new_password)
+        users_db[username]["password_hash"] = await run_in_threadpool(hash_password, password_change.new_password)
+        _invalidate_users_cache()
         
         return {"status": "success", "message": "Password changed successfully"}
         
@@ -151,31 +182,27 @@ async def get_sessions(current_user: dict = Depends(require_admin)):
     """
     Get active sessions (admin only)
     """
-    try:
-        return get_active_sessions()
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get sessions: {str(e)}")
+    return get_active_sessions()
 
 @router.get("/users")
 async def list_users(current_user: dict = Depends(require_admin)):
     """
     List all users (admin only)
     """
-    try:
+    global _users_cache_bytes
+    if _users_cache_bytes is None:
         users = []
         for username, user_data in users_db.items():
-            users.append(User(
+            users.append(User.model_construct(
                 username=user_data["username"],
                 permissions=user_data["permissions"],
                 created_at=user_data["created_at"],
                 last_login=user_data.get("last_login")
-            ))
-        
-        return {"users": users, "total": len(users)}
+            ).model_dump())
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list users: {str(e)}")
+        _users_cache_bytes = orjson.dumps({"users": users, "total": len(users)})
+    
+    return Response(content=_users_cache_bytes, media_type="application/json")
 
 @router.post("/users")
 async def create_new_user(
@@ -186,15 +213,6 @@ async def create_new_user(
     Create new user (admin only)
     """
     try:
-        # Validate permissions
-        valid_permissions = ["read", "write", "admin", "terminal", "control"]
-        for perm in user_create.permissions:
-            if perm not in valid_permissions:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid permission: {perm}"
-                )
-        
         success = create_user(
             user_create.username,
             user_create.password,
@@ -207,6 +225,8 @@ async def create_new_user(
                 detail="User already exists"
             )
         
+        _invalidate_users_cache()
+        
         return {
             "status": "success",
             "message": f"User '{user_create.username}' created successfully"
@@ -227,20 +247,13 @@ async def update_user(
     Update user permissions (admin only)
     """
     try:
-        # Validate permissions
-        valid_permissions = ["read", "write", "admin", "terminal", "control"]
-        for perm in user_update.permissions:
-            if perm not in valid_permissions:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid permission: {perm}"
-                )
-        
         success = update_user_permissions(username, user_update.permissions)
         
         if not success:
             raise HTTPException(status_code=404, detail="User not found")
         
+        _invalidate_users_cache()
+        
         return {
             "status": "success",
             "message": f"User '{username}' updated successfully"
@@ -272,6 +285,8 @@ async def delete_user_endpoint(
         if not success:
             raise HTTPException(status_code=404, detail="User not found or cannot be deleted")
         
+        _invalidate_users_cache()
+        
         return {
             "status": "success",
             "message": f"User '{username}' deleted successfully"
@@ -287,15 +302,7 @@ async def get_available_permissions(current_user: dict = Depends(require_read)):
     """
     Get list of available permissions
     """
-    permissions = {
-        "read": "View data and status",
-        "write": "Modify settings and parameters",
-        "control": "Control robot movement and navigation",
-        "terminal": "Access terminal interface",
-        "admin": "User management and system administration"
-    }
-    
-    return {"permissions": permissions}
+    return Response(content=_PERMISSIONS_BYTES, media_type="application/json")
 
 @router.get("/check")
 async def check_auth(current_user: dict = Depends(get_current_user)):
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+from fastapi import HTTPException
+
+from ros_bridge.ros_interface_noetic import get_ros_bridge
+
+async def require_ros_bridge():
+    """
+    Resolve the ROS bridge for a request, 503 when it is not available
+    """
+    # async so FastAPI resolves it inline instead of sending it to the threadpool
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    return ros_bridge
@@ -1,24 +1,35 @@
 #!/usr/bin/env python3
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional, Dict, Any, Deque, NamedTuple
+from collections import deque
+from dataclasses import dataclass
+import heapq
+import itertools
+import operator
+import numpy as np
 from datetime import datetime, timedelta
 import psutil
 import time
 import sys
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once, re-imports must not grow sys.path)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from ros_bridge.ros_interface_noetic import get_ros_bridge
 from security.auth import require_read, require_admin
+from services import sampler
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Pydantic models
-class SystemMetrics(BaseModel):
+# Response models, built by this module and serialized natively by orjson
+@dataclass
+class SystemMetrics:
     timestamp: float
     cpu_percent: float
     memory_percent: float
@@ -27,7 +38,8 @@ class SystemMetrics(BaseModel):
     disk_io: Dict[str, int]
     temperature: Optional[float] = None
 
-class ProcessInfo(BaseModel):
+@dataclass
+class ProcessInfo:
     pid: int
     name: str
     cpu_percent: float
@@ -35,7 +47,8 @@ class ProcessInfo(BaseModel):
     status: str
     create_time: float
 
-class NetworkInterface(BaseModel):
+@dataclass
+class NetworkInterface:
     interface: str
     bytes_sent: int
     bytes_recv: int
@@ -44,14 +57,16 @@ class NetworkInterface(BaseModel):
     errors_in: int
     errors_out: int
 
-class DiagnosticCheck(BaseModel):
+@dataclass
+class DiagnosticCheck:
     name: str
     status: str  # "OK", "WARNING", "ERROR", "UNKNOWN"
     message: str
     timestamp: float
     details: Optional[Dict[str, Any]] = None
 
-class SystemHealth(BaseModel):
+@dataclass
+class SystemHealth:
     overall_status: str
     checks: List[DiagnosticCheck]
     metrics: SystemMetrics
@@ -59,19 +74,92 @@ class SystemHealth(BaseModel):
     timestamp: float
 
 # Historical data storage (in production, use database)
-metrics_history: List[SystemMetrics] = []
 MAX_HISTORY_SIZE = 1000
+metrics_history: Deque[SystemMetrics] = deque(maxlen=MAX_HISTORY_SIZE)
 
-def collect_system_metrics() -> SystemMetrics:
+# Timestamps of metrics_history in a parallel ring buffer, oldest at _history_head
+_history_timestamps = np.empty(MAX_HISTORY_SIZE, dtype=np.float64)
+_history_head = 0
+
+def _record_metrics(metrics: SystemMetrics):
+    """Append metrics to history, keeping the timestamp ring in step"""
+    global _history_head
+    count = len(metrics_history)
+    
+    if count < MAX_HISTORY_SIZE:
+        _history_timestamps[(_history_head + count) % MAX_HISTORY_SIZE] = metrics.timestamp
+    else:
+        # Overwrite the oldest slot, the deque drops its oldest entry too
+        _history_timestamps[_history_head] = metrics.timestamp
+        _history_head = (_history_head + 1) % MAX_HISTORY_SIZE
+    
+    metrics_history.append(metrics)
+
+def _clear_history() -> int:
+    """Clear metrics history and return the number of dropped entries"""
+    global _history_head
+    cleared_count = len(metrics_history)
+    metrics_history.clear()
+    _history_head = 0
+    return cleared_count
+
+def _history_start_index(cutoff_time: float) -> int:
+    """Index of the first history entry at or after cutoff_time"""
+    count = len(metrics_history)
+    end = _history_head + count
+    
+    # The ring holds at most two sorted segments: [head:] and the wrapped [:end - size]
+    first = _history_timestamps[_history_head:min(end, MAX_HISTORY_SIZE)]
+    index = int(np.searchsorted(first, cutoff_time, side='left'))
+    if index < len(first) or end <= MAX_HISTORY_SIZE:
+        return index
+    
+    second = _history_timestamps[:end - MAX_HISTORY_SIZE]
+    return len(first) + int(np.searchsorted(second, cutoff_time, side='left'))
+
+class SystemSnapshot(NamedTuple):
+    """One round of psutil readings shared by metrics and checks"""
+    cpu_percent: float
+    memory: Any
+    disk: Any
+    network_io: Any
+    disk_io: Any
+    temperature: Optional[float]
+
+def take_system_snapshot() -> SystemSnapshot:
+    """Shared sampler readings plus the temperature"""
+    # Temperature (if available)
+    temperature = None
+    try:
+        temps = psutil.sensors_temperatures()
+        if temps:
+            # Get CPU temperature
+            for name, entries in temps.items():
+                if entries:
+                    temperature = entries[0].current
+                    break
+    except:
+        pass
+    
+    # CPU goes through the sampler, a direct cpu_percent call would reset its baseline
+    shared = sampler.get()
+    return SystemSnapshot(
+        cpu_percent=shared["cpu_percent"],
+        memory=shared["memory"],
+        disk=shared["disk"],
+        network_io=shared["network_io"],
+        disk_io=shared["disk_io"],
+        temperature=temperature
+    )
+
+def collect_system_metrics(snapshot: Optional[SystemSnapshot] = None) -> SystemMetrics:
     """Collect current system metrics"""
     try:
-        # CPU and Memory
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        if snapshot is None:
+            snapshot = take_system_snapshot()
         
         # Network I/O
-        network_io = psutil.net_io_counters()
+        network_io = snapshot.network_io
         network_data = {
             "bytes_sent": network_io.bytes_sent,
             "bytes_recv": network_io.bytes_recv,
@@ -80,7 +168,7 @@ def collect_system_metrics() -> SystemMetrics:
         }
         
         # Disk I/O
-        disk_io = psutil.disk_io_counters()
+        disk_io = snapshot.disk_io
         disk_data = {
             "read_bytes": disk_io.read_bytes if disk_io else 0,
             "write_bytes": disk_io.write_bytes if disk_io else 0,
@@ -88,104 +176,87 @@ def collect_system_metrics() -> SystemMetrics:
             "write_count": disk_io.write_count if disk_io else 0
         }
         
-        # Temperature (if available)
-        temperature = None
-        try:
-            temps = psutil.sensors_temperatures()
-            if temps:
-                # Get CPU temperature
-                for name, entries in temps.items():
-                    if entries:
-                        temperature = entries[0].current
-                        break
-        except:
-            pass
-        
         metrics = SystemMetrics(
             timestamp=time.time(),
-            cpu_percent=cpu_percent,
-            memory_percent=memory.percent,
-            disk_percent=disk.percent,
+            cpu_percent=snapshot.cpu_percent,
+            memory_percent=snapshot.memory.percent,
+            disk_percent=snapshot.disk.percent,
             network_io=network_data,
             disk_io=disk_data,
-            temperature=temperature
+            temperature=snapshot.temperature
         )
         
-        # Store in history
-        metrics_history.append(metrics)
-        if len(metrics_history) > MAX_HISTORY_SIZE:
-            metrics_history.pop(0)
+        # Store in history (oldest entry drops off automatically)
+        _record_metrics(metrics)
         
         return metrics
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to collect metrics: {str(e)}")
 
-def run_diagnostic_checks() -> List[DiagnosticCheck]:
+# (name, value, error above, warning above, messages by status, details) per threshold check
+_THRESHOLD_CHECKS = (
+    (
+        "CPU Usage",
+        lambda snap: snap.cpu_percent,
+        90, 70,
+        {
+            "ERROR": "High CPU usage: {:.1f}%",
+            "WARNING": "Moderate CPU usage: {:.1f}%",
+            "OK": "CPU usage normal: {:.1f}%"
+        },
+        lambda snap: {"cpu_percent": snap.cpu_percent}
+    ),
+    (
+        "Memory Usage",
+        lambda snap: snap.memory.percent,
+        90, 80,
+        {
+            "ERROR": "High memory usage: {:.1f}%",
+            "WARNING": "Moderate memory usage: {:.1f}%",
+            "OK": "Memory usage normal: {:.1f}%"
+        },
+        lambda snap: {"memory_percent": snap.memory.percent, "available_gb": snap.memory.available / (1024**3)}
+    ),
+    (
+        "Disk Usage",
+        lambda snap: snap.disk.percent,
+        95, 85,
+        {
+            "ERROR": "Disk almost full: {:.1f}%",
+            "WARNING": "Disk usage high: {:.1f}%",
+            "OK": "Disk usage normal: {:.1f}%"
+        },
+        lambda snap: {"disk_percent": snap.disk.percent, "free_gb": snap.disk.free / (1024**3)}
+    ),
+)
+
+def run_diagnostic_checks(snapshot: Optional[SystemSnapshot] = None) -> List[DiagnosticCheck]:
     """Run system diagnostic checks"""
     checks = []
     current_time = time.time()
     
     try:
-        # CPU Check
-        cpu_percent = psutil.cpu_percent(interval=1)
-        if cpu_percent > 90:
-            status = "ERROR"
-            message = f"High CPU usage: {cpu_percent:.1f}%"
-        elif cpu_percent > 70:
-            status = "WARNING"
-            message = f"Moderate CPU usage: {cpu_percent:.1f}%"
-        else:
-            status = "OK"
-            message = f"CPU usage normal: {cpu_percent:.1f}%"
-        
-        checks.append(DiagnosticCheck(
-            name="CPU Usage",
-            status=status,
-            message=message,
-            timestamp=current_time,
-            details={"cpu_percent": cpu_percent}
-        ))
-        
-        # Memory Check
-        memory = psutil.virtual_memory()
-        if memory.percent > 90:
-            status = "ERROR"
-            message = f"High memory usage: {memory.percent:.1f}%"
-        elif memory.percent > 80:
-            status = "WARNING"
-            message = f"Moderate memory usage: {memory.percent:.1f}%"
-        else:
-            status = "OK"
-            message = f"Memory usage normal: {memory.percent:.1f}%"
-        
-        checks.append(DiagnosticCheck(
-            name="Memory Usage",
-            status=status,
-            message=message,
-            timestamp=current_time,
-            details={"memory_percent": memory.percent, "available_gb": memory.available / (1024**3)}
-        ))
-        
-        # Disk Check
-        disk = psutil.disk_usage('/')
-        if disk.percent > 95:
-            status = "ERROR"
-            message = f"Disk almost full: {disk.percent:.1f}%"
-        elif disk.percent > 85:
-            status = "WARNING"
-            message = f"Disk usage high: {disk.percent:.1f}%"
-        else:
-            status = "OK"
-            message = f"Disk usage normal: {disk.percent:.1f}%"
-        
-        checks.append(DiagnosticCheck(
-            name="Disk Usage",
-            status=status,
-            message=message,
-            timestamp=current_time,
-            details={"disk_percent": disk.percent, "free_gb": disk.free / (1024**3)}
-        ))
+        if snapshot is None:
+            snapshot = take_system_snapshot()
+        
+        # CPU, memory and disk checks
+        for name, value_fn, error_above, warning_above, messages, details_fn in _THRESHOLD_CHECKS:
+            value = value_fn(snapshot)
+            if value > error_above:
+                status = "ERROR"
+            elif value > warning_above:
+                status = "WARNING"
+            else:
+                status = "OK"
+            
+            checks.append(DiagnosticCheck(
+                name=name,
+                status=status,
+                message=messages[status].format(value),
+                timestamp=current_time,
+                details=details_fn(snapshot)
+            ))
         
         # ROS2 Bridge Check
         ros_bridge = get_ros_bridge()
@@ -208,7 +279,7 @@ def run_diagnostic_checks() -> List[DiagnosticCheck]:
         
         # Network Check
         try:
-            network_io = psutil.net_io_counters()
+            network_io = snapshot.network_io
             if network_io.errin > 100 or network_io.errout > 100:
                 status = "WARNING"
                 message = f"Network errors detected: {network_io.errin + network_io.errout}"
@@ -241,17 +312,20 @@ def run_diagnostic_checks() -> List[DiagnosticCheck]:
             timestamp=current_time
         )]
 
-@router.get("/health", response_model=SystemHealth)
+@router.get("/health")
 async def get_system_health(current_user: dict = Depends(require_read)):
     """
     Get comprehensive system health status
     """
     try:
+        # Read psutil once for both metrics and checks
+        snapshot = take_system_snapshot()
+
         # Collect metrics
-        metrics = collect_system_metrics()
+        metrics = collect_system_metrics(snapshot)
         
         # Run diagnostic checks
-        checks = run_diagnostic_checks()
+        checks = run_diagnostic_checks(snapshot)
         
         # Determine overall status
         error_count = sum(1 for check in checks if check.status == "ERROR")
@@ -267,26 +341,23 @@ async def get_system_health(current_user: dict = Depends(require_read)):
         # System uptime
         uptime = time.time() - psutil.boot_time()
         
-        return SystemHealth(
+        return ORJSONResponse(content=SystemHealth(
             overall_status=overall_status,
             checks=checks,
             metrics=metrics,
             uptime=uptime,
             timestamp=time.time()
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get system health: {str(e)}")
 
-@router.get("/metrics/current", response_model=SystemMetrics)
+@router.get("/metrics/current")
 async def get_current_metrics(current_user: dict = Depends(require_read)):
     """
     Get current system metrics
     """
-    try:
-        return collect_system_metrics()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get metrics: {str(e)}")
+    return ORJSONResponse(content=collect_system_metrics())
 
 @router.get("/metrics/history")
 async def get_metrics_history(
@@ -298,18 +369,56 @@ async def get_metrics_history(
     """
     try:
         cutoff_time = time.time() - (hours * 3600)
-        filtered_metrics = [m for m in metrics_history if m.timestamp >= cutoff_time]
+        start_index = _history_start_index(cutoff_time)
+        filtered_metrics = list(itertools.islice(metrics_history, start_index, None))
         
-        return {
+        return ORJSONResponse(content={
             "status": "success",
             "metrics": filtered_metrics,
             "count": len(filtered_metrics),
             "hours": hours
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get metrics history: {str(e)}")
 
+def _snapshot_processes(limit: int):
+    """Collect the top processes by CPU usage and the total process count"""
+    # (pid, name, cpu_percent, memory_percent, status, create_time) per process
+    process_rows = []
+    
+    for proc in psutil.process_iter():
+        try:
+            # oneshot() reads each /proc entry once for all attributes below
+            with proc.oneshot():
+                process_rows.append((
+                    proc.pid,
+                    proc.name(),
+                    proc.cpu_percent() or 0.0,
+                    proc.memory_percent() or 0.0,
+                    proc.status(),
+                    proc.create_time()
+                ))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    
+    # Only the top entries by CPU usage are returned
+    top_rows = heapq.nlargest(limit, process_rows, key=operator.itemgetter(2))
+    
+    processes = [
+        ProcessInfo(
+            pid=pid,
+            name=name,
+            cpu_percent=cpu_percent,
+            memory_percent=memory_percent,
+            status=status,
+            create_time=create_time
+        )
+        for pid, name, cpu_percent, memory_percent, status, create_time in top_rows
+    ]
+    
+    return processes, len(process_rows)
+
 @router.get("/processes")
 async def get_system_processes(
     limit: int = Query(20, ge=1, le=100, description="Number of processes to return"),
@@ -319,30 +428,14 @@ async def get_system_processes(
     Get system processes information (admin only)
     """
     try:
-        processes = []
-        
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status', 'create_time']):
-            try:
-                proc_info = proc.info
-                processes.append(ProcessInfo(
-                    pid=proc_info['pid'],
-                    name=proc_info['name'],
-                    cpu_percent=proc_info['cpu_percent'] or 0.0,
-                    memory_percent=proc_info['memory_percent'] or 0.0,
-                    status=proc_info['status'],
-                    create_time=proc_info['create_time']
-                ))
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        
-        # Sort by CPU usage
-        processes.sort(key=lambda x: x.cpu_percent, reverse=True)
+        # Walking /proc is slow, keep it off the event loop
+        processes, total_processes = await run_in_threadpool(_snapshot_processes, limit)
         
-        return {
+        return ORJSONResponse(content={
             "status": "success",
-            "processes": processes[:limit],
-            "total_processes": len(processes)
-        }
+            "processes": processes,
+            "total_processes": total_processes
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get processes: {str(e)}")
@@ -352,29 +445,25 @@ async def get_network_info(current_user: dict = Depends(require_read)):
     """
     Get network interface information
     """
-    try:
-        interfaces = []
-        
-        net_io = psutil.net_io_counters(pernic=True)
-        
-        for interface, stats in net_io.items():
-            interfaces.append(NetworkInterface(
-                interface=interface,
-                bytes_sent=stats.bytes_sent,
-                bytes_recv=stats.bytes_recv,
-                packets_sent=stats.packets_sent,
-                packets_recv=stats.packets_recv,
-                errors_in=stats.errin,
-                errors_out=stats.errout
-            ))
-        
-        return {
-            "status": "success",
-            "interfaces": interfaces
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get network info: {str(e)}")
+    interfaces = []
+    
+    net_io = psutil.net_io_counters(pernic=True)
+    
+    for interface, stats in net_io.items():
+        interfaces.append(NetworkInterface(
+            interface=interface,
+            bytes_sent=stats.bytes_sent,
+            bytes_recv=stats.bytes_recv,
+            packets_sent=stats.packets_sent,
+            packets_recv=stats.packets_recv,
+            errors_in=stats.errin,
+            errors_out=stats.errout
+        ))
+    
+    return ORJSONResponse(content={
+        "status": "success",
+        "interfaces": interfaces
+    })
 
 @router.post("/clear-history")
 async def clear_metrics_history(current_user: dict = Depends(require_admin)):
@@ -382,9 +471,7 @@ async def clear_metrics_history(current_user: dict = Depends(require_admin)):
     Clear metrics history (admin only)
     """
     try:
-        global metrics_history
-        cleared_count = len(metrics_history)
-        metrics_history.clear()
+        cleared_count = _clear_history()
         
         return {
             "status": "success",
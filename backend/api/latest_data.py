@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, List, Tuple
+import time
+
+# How long a topic snapshot is reused, well under the sensor publish periods
+LATEST_DATA_TTL = 0.015
+
+# Topic -> (monotonic fetch time, snapshot)
+_latest_cache: Dict[str, Tuple[float, Any]] = {}
+
+def cached_latest_data(ros_bridge, topic: str) -> Any:
+    """
+    ros_bridge.get_latest_data(topic), reused for LATEST_DATA_TTL seconds across requests
+    """
+    now = time.monotonic()
+    cached = _latest_cache.get(topic)
+    if cached is not None and now - cached[0] < LATEST_DATA_TTL:
+        return cached[1]
+
+    # The bridge callbacks replace the per-topic dicts, so sharing the reference is safe
+    data = ros_bridge.get_latest_data(topic)
+    _latest_cache[topic] = (now, data)
+    return data
+
+def cached_latest_bulk(ros_bridge, topics: List[str]) -> Dict[str, Any]:
+    """
+    Snapshots of several topics, the expired ones fetched in one bridge call
+    """
+    now = time.monotonic()
+    snapshots = {}
+    stale = []
+    for topic in topics:
+        cached = _latest_cache.get(topic)
+        if cached is not None and now - cached[0] < LATEST_DATA_TTL:
+            snapshots[topic] = cached[1]
+        else:
+            stale.append(topic)
+
+    if stale:
+        for topic, data in ros_bridge.get_latest_bulk(stale).items():
+            _latest_cache[topic] = (now, data)
+            snapshots[topic] = data
+    return snapshots
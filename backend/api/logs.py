@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import sys
 from pathlib import Path
+import csv
+import io
 import json
 import time
+from functools import lru_cache
+import numpy as np
+
+# Hyperscan is optional, message search falls back to per-message substring checks
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
@@ -16,6 +28,9 @@ from ros_bridge.ros_interface_noetic import get_ros_bridge
 
 router = APIRouter()
 
+# Random source for simulated logs
+_rng = np.random.default_rng()
+
 # Pydantic models
 class LogEntry(BaseModel):
     timestamp: float
@@ -40,18 +55,219 @@ class LogResponse(BaseModel):
     page: int
     page_size: int
 
+@lru_cache(maxsize=64)
+def _compile_search(needle: bytes):
+    """Hyperscan database of a literal search needle, cached for repeated dashboard searches"""
+    database = hyperscan.Database()
+    database.compile(expressions=[needle], literal=True)
+    return database
+
+class LogStore:
+    """Fixed-size ring buffer of log entries with columnar filter fields"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries = np.empty(capacity, dtype=object)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.level_ids = np.zeros(capacity, dtype=np.int32)
+        self.node_ids = np.zeros(capacity, dtype=np.int32)
+        # Lower-cased UTF-8 messages and their byte lengths, computed once at insertion for text search
+        self.messages_lower = np.empty(capacity, dtype=object)
+        self.message_lengths = np.zeros(capacity, dtype=np.int64)
+        # Dictionary encoding of upper-cased levels and node names, ids index the name lists
+        self.level_index: Dict[str, int] = {}
+        self.node_index: Dict[str, int] = {}
+        self.level_names: List[str] = []
+        self.node_names: List[str] = []
+        self.node_names_lower: List[str] = []
+        # Entries per level and per node, kept up to date on insert and eviction
+        self.level_counts: Dict[str, int] = {}
+        self.node_counts: Dict[str, int] = {}
+        self.head = 0  # Slot of the oldest entry
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __iter__(self):
+        """Iterate entries oldest first"""
+        return iter(self.entries[self.ordered_slots()])
+    
+    @staticmethod
+    def _count(counts: Dict[str, int], key: str, delta: int):
+        count = counts.get(key, 0) + delta
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+    
+    @staticmethod
+    def _intern(index: Dict[str, int], names: List[str], value: str) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = len(names)
+            index[value] = value_id
+            names.append(value)
+        return value_id
+    
+    def append(self, entry: LogEntry):
+        """Store entry, overwriting the oldest one when full"""
+        full = self.count == self.capacity
+        slot = self.head if full else self.count
+        level = entry.level.upper()
+        level_id = self._intern(self.level_index, self.level_names, level)
+        node_id = self._intern(self.node_index, self.node_names, entry.node)
+        if node_id == len(self.node_names_lower):
+            self.node_names_lower.append(entry.node.lower())
+        
+        if full:
+            self._count(self.level_counts, self.level_names[self.level_ids[slot]], -1)
+            self._count(self.node_counts, self.node_names[self.node_ids[slot]], -1)
+        self._count(self.level_counts, level, 1)
+        self._count(self.node_counts, entry.node, 1)
+        
+        self.entries[slot] = entry
+        self.timestamps[slot] = entry.timestamp
+        self.level_ids[slot] = level_id
+        self.node_ids[slot] = node_id
+        message = entry.message.lower().encode('utf-8')
+        self.messages_lower[slot] = message
+        self.message_lengths[slot] = len(message)
+        
+        # Publish the slot only once all of its columns are written
+        if full:
+            self.head = (self.head + 1) % self.capacity
+        else:
+            self.count += 1
+    
+    def clear(self):
+        self.entries[:] = None
+        self.messages_lower[:] = None
+        self.level_index.clear()
+        self.node_index.clear()
+        self.level_names.clear()
+        self.node_names.clear()
+        self.node_names_lower.clear()
+        self.level_counts.clear()
+        self.node_counts.clear()
+        self.head = 0
+        self.count = 0
+    
+    def ordered_slots(self, slots: Optional[np.ndarray] = None) -> np.ndarray:
+        """Put ascending slot numbers (all by default) into insertion order"""
+        if slots is None:
+            # The head only moves once the buffer is full, so every slot is in use
+            return (self.head + np.arange(self.count)) % self.capacity
+        if self.head == 0:
+            return slots
+        split = np.searchsorted(slots, self.head)
+        return np.concatenate((slots[split:], slots[:split]))
+    
+    def recent(self, count: int) -> List[LogEntry]:
+        """Most recent entries, newest first"""
+        # Walk back from the newest slot without materializing the whole order
+        newest = self.head + self.count - 1
+        slots = (newest - np.arange(min(count, self.count))) % self.capacity
+        return self.entries[slots].tolist()
+    
+    def filter(
+        self,
+        level: Optional[str] = None,
+        node: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        search: Optional[str] = None
+    ) -> np.ndarray:
+        """Slots of matching entries in insertion order"""
+        # Unfiltered requests (dashboard refresh) skip the mask entirely
+        if not (level or node or start_time or end_time or search):
+            return self.ordered_slots()
+        
+        count = self.count
+        mask = np.ones(count, dtype=bool)
+        
+        if level:
+            level_id = self.level_index.get(level.upper())
+            if level_id is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= self.level_ids[:count] == level_id
+        
+        if start_time:
+            mask &= self.timestamps[:count] >= start_time
+        
+        if end_time:
+            mask &= self.timestamps[:count] <= end_time
+        
+        if node:
+            # Match the needle against each distinct node name once, not per row
+            needle = node.lower()
+            node_ids = [node_id for node_id, name in enumerate(self.node_names_lower) if needle in name]
+            mask &= np.isin(self.node_ids[:count], node_ids)
+        
+        slots = np.flatnonzero(mask)
+        
+        # Text search only runs over rows that passed the column filters
+        if search and len(slots):
+            slots = slots[self._search_mask(slots, search.lower().encode('utf-8'))]
+        
+        return self.ordered_slots(slots)
+    
+    def _search_mask(self, slots: np.ndarray, needle: bytes) -> np.ndarray:
+        """Which of the slots have needle in their lower-cased message"""
+        messages = self.messages_lower[slots]
+        
+        if not HYPERSCAN_AVAILABLE or b"\0" in needle:
+            return np.fromiter(
+                (needle in message for message in messages),
+                dtype=bool, count=len(slots)
+            )
+        
+        # Scan all messages in one pass, NUL separated so no match can span two of them
+        starts = np.zeros(len(slots), dtype=np.int64)
+        np.cumsum(self.message_lengths[slots][:-1] + 1, out=starts[1:])
+        match_ends: List[int] = []
+        _compile_search(needle).scan(
+            b"\0".join(messages),
+            match_event_handler=lambda _id, _start, end, _flags, ends: ends.append(end),
+            context=match_ends
+        )
+        
+        mask = np.zeros(len(slots), dtype=bool)
+        if match_ends:
+            # Owning message of each match, from the offset of its last byte
+            mask[np.searchsorted(starts, np.asarray(match_ends) - 1, side='right') - 1] = True
+        return mask
+    
+    def newest_first(self, slots: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Reorder slots (given in insertion order) by timestamp, newest first,
+        keeping at most limit of them. Equal timestamps stay in insertion order,
+        so every page is a slice of the same order
+        """
+        timestamps = self.timestamps[slots]
+        
+        # Drop everything older than the limit-th newest in O(n), but keep all
+        # entries tied with it so the cut below does not depend on the limit
+        if limit is not None and 0 < limit < len(slots):
+            cutoff = np.partition(timestamps, len(slots) - limit)[len(slots) - limit]
+            newest = np.flatnonzero(timestamps >= cutoff)
+            slots, timestamps = slots[newest], timestamps[newest]
+        
+        # Stable sort on the negated timestamps keeps ties in insertion order
+        return slots[np.argsort(-timestamps, kind='stable')][:limit]
+    
+    def entries_at(self, slots: np.ndarray) -> List[LogEntry]:
+        return self.entries[slots].tolist()
+
 # In-memory log storage (in production, use database)
-log_storage: List[LogEntry] = []
 MAX_LOGS = 10000  # Keep last 10k logs
+log_storage = LogStore(MAX_LOGS)
+
 
 def add_log_entry(entry: LogEntry):
     """Add log entry to storage with size limit"""
-    global log_storage
+    # Oldest entry is overwritten once MAX_LOGS is reached
     log_storage.append(entry)
-    
-    # Keep only recent logs
-    if len(log_storage) > MAX_LOGS:
-        log_storage = log_storage[-MAX_LOGS:]
 
 @router.get("/", response_model=LogResponse)
 async def get_logs(
@@ -68,31 +284,16 @@ async def get_logs(
     """
     try:
         # Apply filters
-        filtered_logs = log_storage.copy()
-        
-        if level:
-            filtered_logs = [log for log in filtered_logs if log.level.upper() == level.upper()]
-        
-        if node:
-            filtered_logs = [log for log in filtered_logs if node.lower() in log.node.lower()]
-        
-        if start_time:
-            filtered_logs = [log for log in filtered_logs if log.timestamp >= start_time]
-        
-        if end_time:
-            filtered_logs = [log for log in filtered_logs if log.timestamp <= end_time]
-        
-        if search:
-            filtered_logs = [log for log in filtered_logs if search.lower() in log.message.lower()]
-        
-        # Sort by timestamp (newest first)
-        filtered_logs.sort(key=lambda x: x.timestamp, reverse=True)
+        slots = log_storage.filter(level, node, start_time, end_time, search)
+        total_filtered = len(slots)
         
         # Pagination
-        total_filtered = len(filtered_logs)
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        page_logs = filtered_logs[start_idx:end_idx]
+        
+        # Sort by timestamp (newest first), only as far as the requested page
+        slots = log_storage.newest_first(slots, limit=end_idx)
+        page_logs = log_storage.entries_at(slots[start_idx:end_idx])
         
         return LogResponse(
             logs=page_logs,
@@ -111,8 +312,7 @@ async def get_recent_logs(count: int = Query(50, ge=1, le=500)):
     Get most recent logs
     """
     try:
-        recent_logs = log_storage[-count:] if log_storage else []
-        recent_logs.reverse()  # Newest first
+        recent_logs = log_storage.recent(count)  # Newest first
         
         return {
             "status": "success",
@@ -129,14 +329,9 @@ async def get_log_levels():
     Get available log levels and their counts
     """
     try:
-        level_counts = {}
-        for log in log_storage:
-            level = log.level.upper()
-            level_counts[level] = level_counts.get(level, 0) + 1
-        
         return {
             "status": "success",
-            "levels": level_counts,
+            "levels": dict(log_storage.level_counts),
             "total_logs": len(log_storage)
         }
         
@@ -148,24 +343,14 @@ async def get_log_nodes():
     """
     Get list of nodes that have generated logs
     """
-    try:
-        nodes = set()
-        for log in log_storage:
-            nodes.add(log.node)
-        
-        node_counts = {}
-        for log in log_storage:
-            node = log.node
-            node_counts[node] = node_counts.get(node, 0) + 1
-        
-        return {
-            "status": "success",
-            "nodes": list(nodes),
-            "node_counts": node_counts
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get log nodes: {str(e)}")
+    # Counts are maintained on insert and eviction, no scan over the stored logs
+    node_counts = dict(log_storage.node_counts)
+    
+    return {
+        "status": "success",
+        "nodes": list(node_counts),
+        "node_counts": node_counts
+    }
 
 @router.delete("/clear")
 async def clear_logs():
@@ -173,7 +358,6 @@ async def clear_logs():
     Clear all stored logs
     """
     try:
-        global log_storage
         cleared_count = len(log_storage)
         log_storage.clear()
         
@@ -185,6 +369,20 @@ async def clear_logs():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear logs: {str(e)}")
 
+def _csv_rows(logs: List[LogEntry]):
+    """Yield the CSV export one line at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(("timestamp", "level", "node", "message", "file", "function", "line"))
+    
+    for log in logs:
+        writer.writerow((log.timestamp, log.level, log.node, log.message, log.file or '', log.function or '', log.line or ''))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    yield buffer.getvalue()
+
 @router.get("/export")
 async def export_logs(
     format: str = Query("json", description="Export format: json, csv"),
@@ -197,41 +395,31 @@ async def export_logs(
     """
     try:
         # Apply filters
-        filtered_logs = log_storage.copy()
+        cutoff_time = time.time() - (hours * 3600) if hours else None
+        filtered_logs = log_storage.entries_at(log_storage.filter(level, node, start_time=cutoff_time))
         
-        if level:
-            filtered_logs = [log for log in filtered_logs if log.level.upper() == level.upper()]
-        
-        if node:
-            filtered_logs = [log for log in filtered_logs if node.lower() in log.node.lower()]
+        export_format = format.lower()
         
-        if hours:
-            cutoff_time = time.time() - (hours * 3600)
-            filtered_logs = [log for log in filtered_logs if log.timestamp >= cutoff_time]
-        
-        if format.lower() == "json":
-            return {
+        if export_format == "json":
+            # Entries are already validated, dump them and let orjson encode directly
+            return ORJSONResponse(content={
                 "status": "success",
                 "format": "json",
-                "logs": [log.dict() for log in filtered_logs],
+                "logs": [log.model_dump() for log in filtered_logs],
                 "count": len(filtered_logs)
-            }
-        elif format.lower() == "csv":
-            # Convert to CSV format
-            csv_lines = ["timestamp,level,node,message,file,function,line"]
-            for log in filtered_logs:
-                csv_line = f"{log.timestamp},{log.level},{log.node},\"{log.message}\",{log.file or ''},{log.function or ''},{log.line or ''}"
-                csv_lines.append(csv_line)
-            
-            return {
-                "status": "success",
-                "format": "csv",
-                "data": "\n".join(csv_lines),
-                "count": len(filtered_logs)
-            }
+            })
+        elif export_format == "csv":
+            # Stream rows as they are written instead of building the whole file in memory
+            return StreamingResponse(
+                _csv_rows(filtered_logs),
+                media_type="text/csv",
+                headers={"Content-Disposition": "attachment; filename=logs.csv"}
+            )
         else:
             raise HTTPException(status_code=400, detail="Unsupported format. Use 'json' or 'csv'")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export logs: {str(e)}")
 
@@ -241,8 +429,6 @@ async def simulate_log_entries():
     Generate sample log entries for testing (development only)
     """
     try:
-        import random
-        
         levels = ["DEBUG", "INFO", "WARN", "ERROR"]
         nodes = ["navigation_node", "localization_node", "sensor_node", "control_node"]
         messages = [
@@ -256,17 +442,26 @@ async def simulate_log_entries():
             "System health check passed"
         ]
         
-        # Generate 20 sample logs
+        # Generate 20 sample logs, drawing every random column in one call each
+        count = 20
         current_time = time.time()
-        for i in range(20):
+        offsets = _rng.integers(0, 3600, size=count, endpoint=True).tolist()  # Last hour
+        level_idx = _rng.integers(len(levels), size=count).tolist()
+        node_idx = _rng.integers(len(nodes), size=count).tolist()
+        message_idx = _rng.integers(len(messages), size=count).tolist()
+        file_idx = _rng.integers(len(nodes), size=count).tolist()
+        functions = _rng.integers(1, 10, size=count, endpoint=True).tolist()
+        lines = _rng.integers(10, 500, size=count, endpoint=True).tolist()
+        
+        for i in range(count):
             log_entry = LogEntry(
-                timestamp=current_time - random.randint(0, 3600),  # Last hour
-                level=random.choice(levels),
-                node=random.choice(nodes),
-                message=random.choice(messages),
-                file=f"src/{random.choice(nodes)}.py",
-                function=f"function_{random.randint(1, 10)}",
-                line=random.randint(10, 500)
+                timestamp=current_time - offsets[i],
+                level=levels[level_idx[i]],
+                node=nodes[node_idx[i]],
+                message=messages[message_idx[i]],
+                file=f"src/{nodes[file_idx[i]]}.py",
+                function=f"function_{functions[i]}",
+                line=lines[i]
             )
             add_log_entry(log_entry)
         
@@ -1,20 +1,47 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import base64
+import hashlib
 import json
 import os
+import threading
 import uuid
 from datetime import datetime
 import numpy as np
 from pathlib import Path
 import logging
 
+from ros_bridge.ros_interface_noetic import get_ros_bridge
+from api.responses import json_response
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Numba is optional, the rasterizers run as plain Python without it
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# OpenCV is optional, NumPy is used for circles and line dilation without it
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
 router = APIRouter()
 
 # Data models
@@ -69,6 +96,15 @@ class ROS2OccupancyGrid(BaseModel):
     origin_y: float
     data: List[int]  # 0=free, 100=occupied, -1=unknown
 
+class ROS2OccupancyGridPacked(BaseModel):
+    width: int
+    height: int
+    resolution: float
+    origin_x: float
+    origin_y: float
+    dtype: str = "int8"
+    data_b64: str  # Base64 of the int8 cells, same order as ROS2OccupancyGrid.data
+
 # Storage paths
 MAPS_DIR = Path("data/maps")
 MAPS_DIR.mkdir(parents=True, exist_ok=True)
@@ -77,84 +113,136 @@ MAPS_FILE = MAPS_DIR / "saved_maps.json"
 ROS2_MAPS_DIR = MAPS_DIR / "ros2"
 ROS2_MAPS_DIR.mkdir(exist_ok=True)
 
+# Map elements are stored per map as compressed NumPy columns, saved_maps.json keeps metadata only
+ELEMENTS_DIR = MAPS_DIR / "elements"
+ELEMENTS_DIR.mkdir(exist_ok=True)
+
+ELEMENT_STR_FIELDS = ("id", "type", "color")
+ELEMENT_FLOAT_FIELDS = ("x", "y", "width", "height", "radius", "x2", "y2")  # None stored as NaN
+
+def _elements_file(map_id: str) -> Path:
+    return ELEMENTS_DIR / f"{map_id}.npz"
+
+def save_map_elements(saved_map: SavedMap):
+    """Write the elements of a map as columns"""
+    elements = saved_map.elements
+    columns = {
+        name: np.array([getattr(element, name) for element in elements], dtype=str)
+        for name in ELEMENT_STR_FIELDS
+    }
+    for name in ELEMENT_FLOAT_FIELDS:
+        values = (getattr(element, name) for element in elements)
+        columns[name] = np.fromiter(
+            (np.nan if value is None else value for value in values),
+            dtype=np.float64, count=len(elements)
+        )
+    columns["selected"] = np.fromiter((element.selected for element in elements), dtype=bool, count=len(elements))
+    
+    with open(_elements_file(saved_map.id), 'wb') as f:
+        np.savez_compressed(f, **columns)
+
+def load_map_elements(map_id: str) -> List[MapElement]:
+    """Read the elements of a map back from columns"""
+    elements_file = _elements_file(map_id)
+    if not elements_file.exists():
+        return []
+    
+    with np.load(elements_file, allow_pickle=False) as data:
+        columns = {name: data[name].tolist() for name in data.files}
+    
+    # Columns were written from validated elements, skip re-validation
+    for name in ELEMENT_FLOAT_FIELDS:
+        if name not in ("x", "y"):
+            columns[name] = [None if value != value else value for value in columns[name]]
+    names = list(columns)
+    return [MapElement.model_construct(**dict(zip(names, row))) for row in zip(*columns.values())]
+
+# Parsed maps keyed by the (mtime_ns, size) of MAPS_FILE they were read from
+_maps_cache: Optional[tuple] = None
+_maps_by_id: Dict[str, SavedMap] = {}
+
+def _invalidate_maps_cache():
+    """Force the next load_saved_maps() to re-read the file"""
+    global _maps_cache
+    _maps_cache = None
+
+def _read_saved_maps() -> List[SavedMap]:
+    """Cached list of saved maps, re-parsed only when MAPS_FILE changes"""
+    global _maps_cache, _maps_by_id
+    if not MAPS_FILE.exists():
+        _maps_cache = None
+        _maps_by_id = {}
+        return []
+    
+    stat = MAPS_FILE.stat()
+    file_key = (stat.st_mtime_ns, stat.st_size)
+    
+    if _maps_cache is None or _maps_cache[0] != file_key:
+        with open(MAPS_FILE, 'r') as f:
+            data = json.load(f)
+        
+        maps = []
+        for map_data in data:
+            # Older files still carry elements inline
+            if "elements" not in map_data:
+                map_data["elements"] = load_map_elements(map_data["id"])
+            maps.append(SavedMap(**map_data))
+        _maps_cache = (file_key, maps)
+        _maps_by_id = {m.id: m for m in maps}
+    
+    return _maps_cache[1]
+
 def load_saved_maps() -> List[SavedMap]:
     """Load saved maps from file"""
     try:
-        if MAPS_FILE.exists():
-            with open(MAPS_FILE, 'r') as f:
-                data = json.load(f)
-                return [SavedMap(**map_data) for map_data in data]
-        return []
+        # Callers may modify the returned list, never the cached one
+        return list(_read_saved_maps())
     except Exception as e:
         logger.error(f"Error loading saved maps: {e}")
         return []
 
+def get_saved_map(map_id: str) -> Optional[SavedMap]:
+    """Look up one saved map by ID"""
+    try:
+        _read_saved_maps()
+        return _maps_by_id.get(map_id)
+    except Exception as e:
+        logger.error(f"Error loading saved maps: {e}")
+        return None
+
 def save_maps_to_file(maps: List[SavedMap]):
     """Save maps to file"""
     try:
+        for map_data in maps:
+            # Maps still identical to the loaded ones already have their elements on disk
+            if _maps_by_id.get(map_data.id) is not map_data or not _elements_file(map_data.id).exists():
+                save_map_elements(map_data)
+        
         with open(MAPS_FILE, 'w') as f:
-            json.dump([map_data.dict() for map_data in maps], f, indent=2)
+            json.dump([map_data.model_dump(exclude={'elements'}) for map_data in maps], f, indent=2)
     except Exception as e:
         logger.error(f"Error saving maps to file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save maps: {str(e)}")
+    finally:
+        _invalidate_maps_cache()
 
 def convert_to_occupancy_grid(saved_map: SavedMap) -> ROS2OccupancyGrid:
     """Convert custom map to ROS2 occupancy grid format"""
+    meta, cells = render_occupancy_grid(saved_map)
+    return ROS2OccupancyGrid(**meta, data=cells.tolist())
+
+def render_occupancy_grid(saved_map: SavedMap) -> tuple:
+    """ROS2 occupancy grid metadata and its flattened int8 cells"""
     try:
-        # Create empty grid (all unknown = -1)
-        grid_data = np.full((saved_map.height, saved_map.width), -1, dtype=np.int8)
-        
-        # Set background as free space (0)
-        grid_data.fill(0)
-        
-        # Process each element
-        for element in saved_map.elements:
-            if element.type == 'line':
-                # Draw line as occupied space
-                if element.x2 is not None and element.y2 is not None:
-                    # Simple line drawing using Bresenham's algorithm
-                    x0, y0 = int(element.x), int(element.y)
-                    x1, y1 = int(element.x2), int(element.y2)
-                    
-                    points = get_line_points(x0, y0, x1, y1)
-                    for px, py in points:
-                        if 0 <= px < saved_map.width and 0 <= py < saved_map.height:
-                            # Make line thick (3 pixels)
-                            for dx in range(-1, 2):
-                                for dy in range(-1, 2):
-                                    nx, ny = px + dx, py + dy
-                                    if 0 <= nx < saved_map.width and 0 <= ny < saved_map.height:
-                                        grid_data[ny, nx] = 100  # Occupied
-            
-            elif element.type == 'rectangle':
-                # Draw rectangle as occupied space
-                if element.width and element.height:
-                    x, y = int(element.x), int(element.y)
-                    w, h = int(element.width), int(element.height)
-                    
-                    # Fill rectangle
-                    for py in range(max(0, y), min(saved_map.height, y + h)):
-                        for px in range(max(0, x), min(saved_map.width, x + w)):
-                            grid_data[py, px] = 100  # Occupied
-            
-            elif element.type == 'circle':
-                # Draw circle as occupied space
-                if element.radius:
-                    cx, cy = int(element.x), int(element.y)
-                    r = int(element.radius)
-                    
-                    # Fill circle
-                    for py in range(max(0, cy - r), min(saved_map.height, cy + r + 1)):
-                        for px in range(max(0, cx - r), min(saved_map.width, cx + r + 1)):
-                            if (px - cx) ** 2 + (py - cy) ** 2 <= r ** 2:
-                                grid_data[py, px] = 100  # Occupied
+        # Draw all elements
+        occupied = _draw_elements(saved_map.elements, saved_map.height, saved_map.width)
         
         # Convert to ROS2 format (flatten and convert coordinates)
         # ROS2 uses row-major order, origin at bottom-left
-        flattened_data = []
-        for y in range(saved_map.height - 1, -1, -1):  # Flip Y axis
-            for x in range(saved_map.width):
-                flattened_data.append(int(grid_data[y, x]))
+        # Flip Y axis. Always copy, occupied may be the thread's scratch buffer and a
+        # single-row flip is already contiguous, ascontiguousarray would return a view of it
+        cells = occupied[::-1].copy().view(np.int8).ravel()
+        cells *= 100  # Free space (0) stays 0, occupied becomes 100
         
         # Calculate origin - align with Gazebo world coordinates
         # Based on the current map size (99x99) and resolution (0.1), this creates a 9.9x9.9m map
@@ -170,22 +258,68 @@ def convert_to_occupancy_grid(saved_map: SavedMap) -> ROS2OccupancyGrid:
         origin_x = -4.92  # Adjusted to match robot position
         origin_y = -4.85  # Adjusted to match robot position
         
-        return ROS2OccupancyGrid(
-            width=saved_map.width,
-            height=saved_map.height,
-            resolution=saved_map.resolution,
-            origin_x=origin_x,
-            origin_y=origin_y,
-            data=flattened_data
-        )
+        meta = {
+            "width": saved_map.width,
+            "height": saved_map.height,
+            "resolution": saved_map.resolution,
+            "origin_x": origin_x,
+            "origin_y": origin_y
+        }
+        return meta, cells
         
     except Exception as e:
         logger.error(f"Error converting map to occupancy grid: {e}")
         raise HTTPException(status_code=500, detail=f"Map conversion failed: {str(e)}")
 
-def get_line_points(x0: int, y0: int, x1: int, y1: int) -> List[tuple]:
-    """Bresenham's line algorithm"""
-    points = []
+def _draw_elements(elements: List[MapElement], height: int, width: int) -> np.ndarray:
+    """Occupancy mask (1 = occupied) of all map elements, drawn one element type at a time"""
+    lines = [
+        (int(e.x), int(e.y), int(e.x2), int(e.y2))
+        for e in elements if e.type == 'line' and e.x2 is not None and e.y2 is not None
+    ]
+    rects = [
+        (int(e.x), int(e.y), int(e.width), int(e.height))
+        for e in elements if e.type == 'rectangle' and e.width and e.height
+    ]
+    circles = [
+        (int(e.x), int(e.y), int(e.radius))
+        for e in elements if e.type == 'circle' and e.radius
+    ]
+    
+    occupied = _scratch_mask("occupied", height, width)
+    
+    if lines:
+        # Trace 1 pixel center lines, then thicken all of them at once to 3 pixels
+        centerlines = _scratch_mask("centerlines", height, width)
+        # Repeated segments mark the same pixels, trace each distinct one once
+        _trace_lines(centerlines, np.array(list(set(lines)), dtype=np.int64))
+        occupied |= _dilate_3x3(centerlines)
+    
+    for x, y, w, h in rects:
+        _fill_rect(occupied, x, y, w, h)
+    
+    for cx, cy, r in circles:
+        _fill_circle(occupied, cx, cy, r)
+    
+    return occupied
+
+# Per thread drawing buffers, reused across conversions instead of reallocated
+_scratch = threading.local()
+
+def _scratch_mask(name: str, height: int, width: int) -> np.ndarray:
+    """Zeroed contiguous (height, width) uint8 view of a per thread scratch buffer"""
+    buffer = getattr(_scratch, name, None)
+    if buffer is None or buffer.size < height * width:
+        buffer = np.empty(height * width, dtype=np.uint8)
+        setattr(_scratch, name, buffer)
+    mask = buffer[:height * width].reshape(height, width)
+    mask.fill(0)
+    return mask
+
+@njit(cache=True)
+def _trace_line(mask, x0, y0, x1, y1):
+    """Mark the in-bounds pixels of a line with Bresenham's algorithm"""
+    height, width = mask.shape
     dx = abs(x1 - x0)
     dy = abs(y1 - y0)
     sx = 1 if x0 < x1 else -1
@@ -195,7 +329,8 @@ def get_line_points(x0: int, y0: int, x1: int, y1: int) -> List[tuple]:
     x, y = x0, y0
     
     while True:
-        points.append((x, y))
+        if 0 <= x < width and 0 <= y < height:
+            mask[y, x] = 1
         
         if x == x1 and y == y1:
             break
@@ -207,8 +342,96 @@ def get_line_points(x0: int, y0: int, x1: int, y1: int) -> List[tuple]:
         if e2 < dx:
             err += dx
             y += sy
+
+@njit(parallel=True, cache=True)
+def _trace_lines(mask, segments):
+    """Trace (x0, y0, x1, y1) segments in parallel, overlapping writes all store the same 1"""
+    for i in prange(segments.shape[0]):
+        _trace_line(mask, segments[i, 0], segments[i, 1], segments[i, 2], segments[i, 3])
+
+# cv2.line is not used for lines, its pixel choice differs from the Bresenham walk above
+_BRUSH_3X3 = np.ones((3, 3), dtype=np.uint8)
+
+def _dilate_3x3(mask: np.ndarray) -> np.ndarray:
+    """Grow every marked pixel into a 3x3 square"""
+    if CV2_AVAILABLE:
+        return cv2.dilate(mask, _BRUSH_3X3)
     
-    return points
+    height, width = mask.shape
+    padded = np.pad(mask, 1)
+    dilated = np.zeros_like(mask)
+    for dy in range(3):
+        for dx in range(3):
+            dilated |= padded[dy:dy + height, dx:dx + width]
+    return dilated
+
+def _fill_rect(mask, x, y, w, h):
+    """Fill a rectangle"""
+    height, width = mask.shape
+    y0, y1 = max(0, y), max(0, min(height, y + h))
+    x0, x1 = max(0, x), max(0, min(width, x + w))
+    mask[y0:y1, x0:x1] = 1
+
+def _fill_circle(mask, cx, cy, r):
+    """Fill a circle"""
+    height, width = mask.shape
+    y0, y1 = max(0, cy - r), min(height, cy + r + 1)
+    x0, x1 = max(0, cx - r), min(width, cx + r + 1)
+    if y0 >= y1 or x0 >= x1:
+        return
+    
+    if CV2_AVAILABLE:
+        cv2.circle(mask, (cx, cy), r, 1, thickness=-1, lineType=cv2.LINE_8)
+        return
+    
+    # Mask of the bounding box cells inside the circle
+    ys, xs = np.ogrid[y0:y1, x0:x1]
+    inside = (xs - cx) ** 2 + (ys - cy) ** 2 <= r ** 2
+    mask[y0:y1, x0:x1][inside] = 1
+
+def _ros2_cache_files(map_id: str) -> tuple:
+    """Metadata and raw int8 grid files of a cached ROS2 map"""
+    return ROS2_MAPS_DIR / f"{map_id}.meta.json", ROS2_MAPS_DIR / f"{map_id}.grid.i8"
+
+def save_ros2_grid(map_id: str, meta: Dict[str, Any], cells: np.ndarray):
+    """Cache a ROS2 occupancy grid as metadata JSON plus raw int8 cells"""
+    meta_file, grid_file = _ros2_cache_files(map_id)
+    cells.astype(np.int8, copy=False).tofile(grid_file)
+    with open(meta_file, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+def _ensure_ros2_cache(map_id: str) -> bool:
+    """Convert and cache the ROS2 grid of a map if needed, False if the map does not exist"""
+    meta_file, grid_file = _ros2_cache_files(map_id)
+    if meta_file.exists() and grid_file.exists():
+        return True
+    
+    map_data = get_saved_map(map_id)
+    if not map_data:
+        return False
+    
+    save_ros2_grid(map_id, *render_occupancy_grid(map_data))
+    logger.info(f"Generated ROS2 occupancy grid for map: {map_data.name}")
+    return True
+
+def _read_ros2_meta(map_id: str) -> Dict[str, Any]:
+    meta_file, _ = _ros2_cache_files(map_id)
+    with open(meta_file, 'r') as f:
+        return json.load(f)
+
+def load_ros2_grid(map_id: str) -> Optional[ROS2OccupancyGrid]:
+    """Cached ROS2 occupancy grid of a map, converted and cached on first use"""
+    if not _ensure_ros2_cache(map_id):
+        return None
+    
+    _, grid_file = _ros2_cache_files(map_id)
+    return ROS2OccupancyGrid(**_read_ros2_meta(map_id), data=np.fromfile(grid_file, dtype=np.int8).tolist())
+
+def _remove_ros2_cache(map_id: str):
+    """Remove cached ROS2 files of a map, including the older single JSON file"""
+    for cache_file in (*_ros2_cache_files(map_id), ROS2_MAPS_DIR / f"{map_id}.json"):
+        if cache_file.exists():
+            cache_file.unlink()
 
 @router.get("/maps", response_model=List[SavedMap])
 async def get_saved_maps():
@@ -228,11 +451,11 @@ async def save_map(map_data: SavedMap):
         maps = load_saved_maps()
         
         # Check if map exists (update) or create new
-        existing_index = next((i for i, m in enumerate(maps) if m.id == map_data.id), None)
+        existing_map = get_saved_map(map_data.id)
         
-        if existing_index is not None:
+        if existing_map is not None:
             # Update existing map
-            maps[existing_index] = map_data
+            maps[maps.index(existing_map)] = map_data
             logger.info(f"Updated existing map: {map_data.name} (ID: {map_data.id})")
         else:
             # Add new map
@@ -246,13 +469,10 @@ async def save_map(map_data: SavedMap):
         
         # Convert to ROS2 format and save
         try:
-            ros2_grid = convert_to_occupancy_grid(map_data)
-            ros2_file = ROS2_MAPS_DIR / f"{map_data.id}.json"
-            
-            with open(ros2_file, 'w') as f:
-                json.dump(ros2_grid.dict(), f, indent=2)
+            _remove_ros2_cache(map_data.id)
+            save_ros2_grid(map_data.id, *render_occupancy_grid(map_data))
             
-            logger.info(f"Converted and saved ROS2 map: {ros2_file}")
+            logger.info(f"Converted and saved ROS2 map: {map_data.id}")
         except Exception as e:
             logger.warning(f"Failed to convert map to ROS2 format: {e}")
         
@@ -266,8 +486,7 @@ async def save_map(map_data: SavedMap):
 async def get_map(map_id: str):
     """Get a specific map by ID"""
     try:
-        maps = load_saved_maps()
-        map_data = next((m for m in maps if m.id == map_id), None)
+        map_data = get_saved_map(map_id)
         
         if not map_data:
             raise HTTPException(status_code=404, detail="Map not found")
@@ -285,8 +504,7 @@ async def get_map(map_id: str):
 async def delete_map(map_id: str):
     """Delete a map"""
     try:
-        maps = load_saved_maps()
-        map_data = next((m for m in maps if m.id == map_id), None)
+        map_data = get_saved_map(map_id)
         
         if not map_data:
             raise HTTPException(status_code=404, detail="Map not found")
@@ -317,13 +535,16 @@ async def delete_map(map_id: str):
                     logger.info(f"Deleted png file: {png_path}")
         
         # Remove from list
-        maps = [m for m in maps if m.id != map_id]
+        maps = [m for m in load_saved_maps() if m.id != map_id]
         save_maps_to_file(maps)
         
-        # Remove ROS2 file
-        ros2_file = ROS2_MAPS_DIR / f"{map_id}.json"
-        if ros2_file.exists():
-            ros2_file.unlink()
+        # Remove ROS2 files
+        _remove_ros2_cache(map_id)
+        
+        # Remove element columns
+        elements_file = _elements_file(map_id)
+        if elements_file.exists():
+            elements_file.unlink()
         
         logger.info(f"Deleted map: {map_data.name} (ID: {map_id})")
         return {"message": "Map deleted successfully"}
@@ -335,32 +556,39 @@ async def delete_map(map_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/maps/{map_id}/ros2", response_model=ROS2OccupancyGrid)
-async def get_ros2_map(map_id: str):
+async def get_ros2_map(
+    map_id: str,
+    request: Request,
+    format: str = Query("json", description="Response format: json, packed (base64 int8 data), raw (int8 cells, metadata in headers)")
+):
     """Get ROS2 occupancy grid format of a map"""
     try:
-        # Try to load from ROS2 cache first
-        ros2_file = ROS2_MAPS_DIR / f"{map_id}.json"
+        # Make sure the map is converted and cached
+        if not _ensure_ros2_cache(map_id):
+            raise HTTPException(status_code=404, detail="Map not found")
+        _, grid_file = _ros2_cache_files(map_id)
         
-        if ros2_file.exists():
-            with open(ros2_file, 'r') as f:
-                data = json.load(f)
-                return ROS2OccupancyGrid(**data)
+        # The cached grid is rewritten whenever the map is saved
+        stat = grid_file.stat()
+        etag = '"' + hashlib.md5(f"{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest() + '"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # If not cached, convert from original map
-        maps = load_saved_maps()
-        map_data = next((m for m in maps if m.id == map_id), None)
+        meta = _read_ros2_meta(map_id)
+        headers = {"ETag": etag}
+        grid_format = format.lower()
         
-        if not map_data:
-            raise HTTPException(status_code=404, detail="Map not found")
+        if grid_format == "raw":
+            headers.update({f"X-Map-{key.replace('_', '-').title()}": str(value) for key, value in meta.items()})
+            return FileResponse(grid_file, media_type="application/octet-stream", headers=headers)
         
-        ros2_grid = convert_to_occupancy_grid(map_data)
+        if grid_format == "packed":
+            # Roughly a quarter of the size of the integer list, no per-cell Python objects
+            packed = ROS2OccupancyGridPacked(**meta, data_b64=base64.b64encode(grid_file.read_bytes()).decode('ascii'))
+            return json_response(packed.model_dump(), headers=headers)
         
-        # Cache the result
-        with open(ros2_file, 'w') as f:
-            json.dump(ros2_grid.dict(), f, indent=2)
-        
-        logger.info(f"Generated ROS2 occupancy grid for map: {map_data.name}")
-        return ros2_grid
+        grid = ROS2OccupancyGrid(**meta, data=np.fromfile(grid_file, dtype=np.int8).tolist())
+        return json_response(grid.model_dump(), headers=headers)
         
     except HTTPException:
         raise
@@ -373,10 +601,11 @@ async def publish_map_to_ros2(map_id: str):
     """Publish map to ROS2 system"""
     try:
         # Get ROS2 format
-        ros2_grid = await get_ros2_map(map_id)
+        ros2_grid = load_ros2_grid(map_id)
+        if ros2_grid is None:
+            raise HTTPException(status_code=404, detail="Map not found")
         
         # Get ROS2 bridge
-        from ros_bridge.ros_interface_noetic import get_ros_bridge
         ros_bridge = get_ros_bridge()
         
         if not ros_bridge:
@@ -384,7 +613,7 @@ async def publish_map_to_ros2(map_id: str):
         
         # Publish map (you'll need to implement this in ros_interface.py)
         try:
-            ros_bridge.publish_map(ros2_grid.dict())
+            await run_in_threadpool(ros_bridge.publish_map, ros2_grid.model_dump())
             logger.info(f"Published map {map_id} to ROS2")
             return {"message": "Map published to ROS2 successfully"}
         except Exception as e:
@@ -410,7 +639,7 @@ async def get_maps_stats():
             "average_elements_per_map": 0,
             "storage_info": {
                 "maps_file_size": MAPS_FILE.stat().st_size if MAPS_FILE.exists() else 0,
-                "ros2_maps_count": len(list(ROS2_MAPS_DIR.glob("*.json")))
+                "ros2_maps_count": len(list(ROS2_MAPS_DIR.glob("*.grid.i8")))
             }
         }
         
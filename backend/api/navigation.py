@@ -1,19 +1,28 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Literal, Optional
+import asyncio
+import base64
 import logging
+import numpy as np
+import orjson
 import sys
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once, re-imports must not grow sys.path)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from ros_bridge.ros_interface_noetic import get_ros_bridge
+from api.responses import json_response, etag_for, not_modified, cached_json_response, wants_msgpack, msgpack_response, REVALIDATE_HEADERS
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Global WebSocket manager instance (will be injected by main app)
 websocket_manager = None
@@ -23,6 +32,21 @@ def set_websocket_manager(manager):
     global websocket_manager
     websocket_manager = manager
 
+# Background broadcasts in flight, the event loop only keeps weak references to tasks
+_broadcast_tasks = set()
+
+def _broadcast_done(task: asyncio.Task):
+    """Drop a finished broadcast and log its failure, if any"""
+    _broadcast_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Switch state broadcast failed: {task.exception()}")
+
+def _broadcast_in_background(coro):
+    """Run a broadcast without holding up the response, keeping its task alive until it ends"""
+    task = asyncio.create_task(coro)
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_done)
+
 # Pydantic models
 class NavigationGoal(BaseModel):
     x: float
@@ -39,93 +63,96 @@ class WaypointMission(BaseModel):
     waypoints: List[Waypoint]
     loop: bool = False
 
+# Unknown sources and modes are rejected with 422 by the models
+class MapSourceRequest(BaseModel):
+    source: Literal["static_map", "dynamic_map"]
+
+class PositionModeRequest(BaseModel):
+    mode: Literal["receive_from_ros", "send_to_ros"]
+
+class InitialPose(BaseModel):
+    x: float
+    y: float
+    theta: float = 0.0
+
 @router.post("/goal")
 async def set_navigation_goal(goal: NavigationGoal):
     """
     Set navigation goal for the robot
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        ros_bridge.publish_navigation_goal(goal.x, goal.y, goal.orientation_w)
-        
-        return {
-            "status": "success",
-            "message": f"Navigation goal set to ({goal.x}, {goal.y})",
-            "goal": goal.dict()
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to set navigation goal: {str(e)}")
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    
+    # Publishing goes through rospy and may block, keep it off the event loop
+    await run_in_threadpool(ros_bridge.publish_navigation_goal, goal.x, goal.y, goal.orientation_w)
+    
+    return json_response({
+        "status": "success",
+        "message": f"Navigation goal set to ({goal.x}, {goal.y})",
+        "goal": goal.model_dump()
+    })
 
 @router.post("/cancel")
 async def cancel_navigation():
     """
     Cancel current navigation goal
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Send current position as goal to stop navigation
-        pose_data = ros_bridge.get_latest_data('pose')
-        if pose_data:
-            ros_bridge.publish_navigation_goal(
-                pose_data['x'], 
-                pose_data['y'], 
-                pose_data['orientation']['w']
-            )
-        else:
-            # Fallback: send stop command
-            ros_bridge.publish_cmd_vel(0.0, 0.0, 0.0)
-        
-        return {
-            "status": "success",
-            "message": "Navigation cancelled"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to cancel navigation: {str(e)}")
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    
+    # Send current position as goal to stop navigation
+    pose_data = ros_bridge.get_latest_data('pose')
+    if pose_data:
+        await run_in_threadpool(
+            ros_bridge.publish_navigation_goal,
+            pose_data['x'], 
+            pose_data['y'], 
+            pose_data['orientation']['w']
+        )
+    else:
+        # Fallback: send stop command
+        await run_in_threadpool(ros_bridge.publish_cmd_vel, 0.0, 0.0, 0.0)
+    
+    return {
+        "status": "success",
+        "message": "Navigation cancelled"
+    }
 
 @router.get("/status")
 async def get_navigation_status():
     """
     Get current navigation status
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Get relevant data
-        pose_data = ros_bridge.get_latest_data('pose')
-        odom_data = ros_bridge.get_latest_data('odom')
-        
-        # Calculate navigation status
-        status = {
-            "current_pose": pose_data,
-            "velocity": odom_data.get('linear_velocity') if odom_data else None,
-            "is_moving": False,
-            "navigation_active": False
-        }
-        
-        # Check if robot is moving
-        if odom_data and odom_data.get('linear_velocity'):
-            vel = odom_data['linear_velocity']
-            speed = (vel['x']**2 + vel['y']**2)**0.5
-            status["is_moving"] = speed > 0.01
-            status["navigation_active"] = speed > 0.01
-        
-        return {
-            "status": "success",
-            "navigation_status": status
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get navigation status: {str(e)}")
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    
+    # Get relevant data
+    pose_data = ros_bridge.get_latest_data('pose')
+    odom_data = ros_bridge.get_latest_data('odom')
+    
+    # Calculate navigation status
+    status = {
+        "current_pose": pose_data,
+        "velocity": odom_data.get('linear_velocity') if odom_data else None,
+        "is_moving": False,
+        "navigation_active": False
+    }
+    
+    # Check if robot is moving (speed above 0.01, compared squared)
+    if odom_data and odom_data.get('linear_velocity'):
+        vel = odom_data['linear_velocity']
+        vx, vy = vel['x'], vel['y']
+        moving = vx * vx + vy * vy > 0.0001
+        status["is_moving"] = moving
+        status["navigation_active"] = moving
+    
+    return json_response({
+        "status": "success",
+        "navigation_status": status
+    })
 
 # Global state for map source switching
 map_source_state = {
@@ -137,102 +164,153 @@ map_source_state = {
     }
 }
 
+# Serialized GET /map-source response and its ETag, rebuilt after the source is switched
+_map_source_bytes: Optional[bytes] = None
+_map_source_etag = ""
+
 @router.get("/map-source")
-async def get_map_source():
+async def get_map_source(request: Request):
     """
     Get current map data source configuration
     """
-    try:
-        return {
+    global _map_source_bytes, _map_source_etag
+    if _map_source_bytes is None:
+        _map_source_bytes = orjson.dumps({
             "status": "success",
             "current_source": map_source_state["current_source"],
             "available_sources": map_source_state["available_sources"],
             "topic_mapping": map_source_state["topic_mapping"]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get map source: {str(e)}")
+        })
+        _map_source_etag = etag_for(_map_source_bytes)
+    
+    return cached_json_response(request, _map_source_bytes, _map_source_etag, headers=REVALIDATE_HEADERS)
 
 @router.post("/map-source")
-async def set_map_source(request: dict):
+async def set_map_source(request: MapSourceRequest):
     """
     Set map data source (static_map or dynamic_map)
     """
-    try:
-        new_source = request.get("source")
-
-        if not new_source:
-            raise HTTPException(status_code=400, detail="Missing 'source' parameter")
-
-        if new_source not in map_source_state["available_sources"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid source. Available: {map_source_state['available_sources']}"
-            )
-
-        # Update the state
-        old_source = map_source_state["current_source"]
-        map_source_state["current_source"] = new_source
-
-        # Get ROS bridge and update subscription if needed
-        ros_bridge = get_ros_bridge()
-        if ros_bridge:
-            # Update the topic subscription in ROS bridge
-            new_topic = map_source_state["topic_mapping"][new_source]
-            ros_bridge.switch_map_topic(new_topic)
-
-        logger.info(f"Map source switched from {old_source} to {new_source}")
-        logger.info(f"Now subscribing to topic: {map_source_state['topic_mapping'][new_source]}")
-
-        # Broadcast switch state change
-        if websocket_manager:
-            await websocket_manager.broadcast_switch_state('map_source', {
-                'previous_source': old_source,
-                'current_source': new_source,
-                'topic': map_source_state['topic_mapping'][new_source]
-            })
-
-        return {
-            "status": "success",
-            "message": f"Map source switched to {new_source}",
-            "previous_source": old_source,
-            "current_source": new_source,
-            "topic": map_source_state["topic_mapping"][new_source]
-        }
+    new_source = request.source
+    new_topic = map_source_state["topic_mapping"][new_source]
+
+    # Update the state
+    global _map_source_bytes
+    old_source = map_source_state["current_source"]
+    map_source_state["current_source"] = new_source
+    _map_source_bytes = None
+
+    # Get ROS bridge and update subscription if needed
+    ros_bridge = get_ros_bridge()
+    if ros_bridge:
+        # Update the topic subscription in ROS bridge
+        await run_in_threadpool(ros_bridge.switch_map_topic, new_topic)
+
+    logger.info(f"Map source switched from {old_source} to {new_source}")
+    logger.info(f"Now subscribing to topic: {new_topic}")
+
+    # Broadcast switch state change without holding up the response
+    if websocket_manager:
+        _broadcast_in_background(websocket_manager.broadcast_switch_state('map_source', {
+            'previous_source': old_source,
+            'current_source': new_source,
+            'topic': new_topic
+        }))
+
+    return {
+        "status": "success",
+        "message": f"Map source switched to {new_source}",
+        "previous_source": old_source,
+        "current_source": new_source,
+        "topic": new_topic
+    }
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to set map source: {str(e)}")
+# Occupancy cells encoded per chunk of a streamed /map response
+MAP_STREAM_CHUNK_CELLS = 65536
+
+def _stream_map(map_data: Dict[str, Any], source: str, topic: str) -> Iterator[bytes]:
+    """
+    /map response JSON, with the occupancy data emitted in chunks as it is encoded
+    """
+    cells = map_data['data']
+    info = orjson.dumps({key: value for key, value in map_data.items() if key != 'data'}, default=str)
+    
+    yield b'{"status":"success","source":' + orjson.dumps(source) + b',"topic":' + orjson.dumps(topic)
+    yield b',"map":' + info[:-1] + (b',"data":[' if len(info) > 2 else b'"data":[')
+    for start in range(0, len(cells), MAP_STREAM_CHUNK_CELLS):
+        chunk = orjson.dumps(cells[start:start + MAP_STREAM_CHUNK_CELLS], option=orjson.OPT_SERIALIZE_NUMPY)
+        yield (b',' if start else b'') + chunk[1:-1]
+    yield b']}}'
 
 @router.get("/map")
-async def get_map():
+async def get_map(
+    request: Request,
+    format: str = Query("json", description="Response format: json, packed (base64 int8 data)")
+):
     """
     Get current map data from the active source
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-
-        map_data = ros_bridge.get_latest_data('map')
-
-        if map_data is None:
-            return {
-                "status": "no_data",
-                "message": "No map data available",
-                "map": None,
-                "source": map_source_state["current_source"]
-            }
-
-        return {
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+
+    map_data = ros_bridge.get_latest_data('map')
+
+    if map_data is None:
+        return json_response({
+            "status": "no_data",
+            "message": "No map data available",
+            "map": None,
+            "source": map_source_state["current_source"]
+        })
+
+    source = map_source_state["current_source"]
+    topic = map_source_state["topic_mapping"][source]
+    cells = map_data.get('data')
+    packed = cells is not None and format.lower() == "packed"
+    use_msgpack = not packed and wants_msgpack(request)
+    
+    # Every map update from the bridge is a new dict with its own receive timestamp
+    headers = {"Vary": "Accept", **REVALIDATE_HEADERS}
+    timestamp = map_data.get('timestamp')
+    if timestamp is not None:
+        representation = "packed" if packed else "msgpack" if use_msgpack else "json"
+        headers["ETag"] = f'W/"{timestamp}-{source}-{representation}"'
+        unchanged = not_modified(request, headers["ETag"], headers)
+        if unchanged:
+            return unchanged
+    
+    # Packed grids carry the cells as one base64 string of int8 instead of a JSON number per cell
+    if packed:
+        packed_map = {key: value for key, value in map_data.items() if key != 'data'}
+        packed_map['dtype'] = "int8"
+        packed_map['data_b64'] = base64.b64encode(np.asarray(cells, dtype=np.int8).tobytes()).decode('ascii')
+        return json_response({
+            "status": "success",
+            "map": packed_map,
+            "source": source,
+            "topic": topic
+        }, headers=headers)
+    
+    # Clients that opt in get MessagePack, grid cells mostly pack into a single byte each
+    if use_msgpack:
+        return msgpack_response({
             "status": "success",
             "map": map_data,
-            "source": map_source_state["current_source"],
-            "topic": map_source_state["topic_mapping"][map_source_state["current_source"]]
-        }
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get map: {str(e)}")
+            "source": source,
+            "topic": topic
+        }, headers=headers)
+    
+    # Large grids are streamed in slices instead of being encoded into one buffer
+    if cells is not None and len(cells) > MAP_STREAM_CHUNK_CELLS:
+        return StreamingResponse(_stream_map(map_data, source, topic), media_type="application/json", headers=headers)
+    
+    # Smaller grids are serialized in one orjson pass, without jsonable_encoder
+    return json_response({
+        "status": "success",
+        "map": map_data,
+        "source": source,
+        "topic": topic
+    }, headers=headers)
 
 # Global state for robot position mode switching
 position_mode_state = {
@@ -244,130 +322,125 @@ position_mode_state = {
     }
 }
 
+# Serialized GET /position-mode response and its ETag, rebuilt after the mode is switched
+_position_mode_bytes: Optional[bytes] = None
+_position_mode_etag = ""
+
 @router.get("/position-mode")
-async def get_position_mode():
+async def get_position_mode(request: Request):
     """
     Get current robot position mode configuration
     """
-    try:
-        return {
+    global _position_mode_bytes, _position_mode_etag
+    if _position_mode_bytes is None:
+        _position_mode_bytes = orjson.dumps({
             "status": "success",
             "current_mode": position_mode_state["current_mode"],
             "available_modes": position_mode_state["available_modes"],
             "description": position_mode_state["description"]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get position mode: {str(e)}")
+        })
+        _position_mode_etag = etag_for(_position_mode_bytes)
+    
+    return cached_json_response(request, _position_mode_bytes, _position_mode_etag, headers=REVALIDATE_HEADERS)
 
 @router.post("/position-mode")
-async def set_position_mode(request: dict):
+async def set_position_mode(request: PositionModeRequest):
     """
     Set robot position mode (receive_from_ros or send_to_ros)
     """
-    try:
-        new_mode = request.get("mode")
-
-        if not new_mode:
-            raise HTTPException(status_code=400, detail="Missing 'mode' parameter")
-
-        if new_mode not in position_mode_state["available_modes"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid mode. Available: {position_mode_state['available_modes']}"
-            )
-
-        # Update the state
-        old_mode = position_mode_state["current_mode"]
-        position_mode_state["current_mode"] = new_mode
-
-        # Get ROS bridge and update behavior if needed
-        ros_bridge = get_ros_bridge()
-        if ros_bridge:
-            # Update the position mode in ROS bridge
-            ros_bridge.set_position_mode(new_mode)
-
-        logger.info(f"Position mode switched from {old_mode} to {new_mode}")
-
-        # Broadcast switch state change
-        if websocket_manager:
-            await websocket_manager.broadcast_switch_state('position_mode', {
-                'previous_mode': old_mode,
-                'current_mode': new_mode,
-                'description': position_mode_state["description"][new_mode]
-            })
-
-        return {
-            "status": "success",
-            "message": f"Position mode switched to {new_mode}",
-            "previous_mode": old_mode,
-            "current_mode": new_mode,
-            "description": position_mode_state["description"][new_mode]
-        }
+    new_mode = request.mode
+    description = position_mode_state["description"][new_mode]
+
+    # Update the state
+    global _position_mode_bytes
+    old_mode = position_mode_state["current_mode"]
+    position_mode_state["current_mode"] = new_mode
+    _position_mode_bytes = None
+
+    # Get ROS bridge and update behavior if needed
+    ros_bridge = get_ros_bridge()
+    if ros_bridge:
+        # Update the position mode in ROS bridge
+        await run_in_threadpool(ros_bridge.set_position_mode, new_mode)
+
+    logger.info(f"Position mode switched from {old_mode} to {new_mode}")
+
+    # Broadcast switch state change without holding up the response
+    if websocket_manager:
+        _broadcast_in_background(websocket_manager.broadcast_switch_state('position_mode', {
+            'previous_mode': old_mode,
+            'current_mode': new_mode,
+            'description': description
+        }))
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to set position mode: {str(e)}")
+    return {
+        "status": "success",
+        "message": f"Position mode switched to {new_mode}",
+        "previous_mode": old_mode,
+        "current_mode": new_mode,
+        "description": description
+    }
 
 @router.post("/set-initial-pose")
-async def set_initial_pose(request: dict):
+async def set_initial_pose(pose: InitialPose):
     """
     Set robot initial pose (only works when position mode is 'send_to_ros')
     """
-    try:
-        if position_mode_state["current_mode"] != "send_to_ros":
-            raise HTTPException(
-                status_code=400,
-                detail="Initial pose can only be set when position mode is 'send_to_ros'"
-            )
+    if position_mode_state["current_mode"] != "send_to_ros":
+        raise HTTPException(
+            status_code=400,
+            detail="Initial pose can only be set when position mode is 'send_to_ros'"
+        )
 
-        x = request.get("x")
-        y = request.get("y")
-        theta = request.get("theta", 0.0)
+    x, y, theta = pose.x, pose.y, pose.theta
 
-        if x is None or y is None:
-            raise HTTPException(status_code=400, detail="Missing 'x' or 'y' coordinates")
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS bridge not available")
 
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS bridge not available")
+    # Send initial pose to ROS
+    await run_in_threadpool(ros_bridge.publish_initial_pose, x, y, theta)
 
-        # Send initial pose to ROS
-        ros_bridge.publish_initial_pose(float(x), float(y), float(theta))
+    logger.info(f"Initial pose set to ({x}, {y}, {theta})")
 
-        logger.info(f"Initial pose set to ({x}, {y}, {theta})")
+    return {
+        "status": "success",
+        "message": "Initial pose set successfully",
+        "pose": {"x": x, "y": y, "theta": theta}
+    }
 
-        return {
-            "status": "success",
-            "message": "Initial pose set successfully",
-            "pose": {"x": x, "y": y, "theta": theta}
-        }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to set initial pose: {str(e)}")
-
-# Predefined navigation goals
-@router.post("/goto/kitchen")
-async def goto_kitchen():
-    """Navigate to kitchen"""
-    return await set_navigation_goal(NavigationGoal(x=2.0, y=1.0))
-
-@router.post("/goto/living_room")
-async def goto_living_room():
-    """Navigate to living room"""
-    return await set_navigation_goal(NavigationGoal(x=1.0, y=2.0))
-
-@router.post("/goto/bedroom")
-async def goto_bedroom():
-    """Navigate to bedroom"""
-    return await set_navigation_goal(NavigationGoal(x=3.0, y=3.0))
-
-@router.post("/goto/entrance")
-async def goto_entrance():
-    """Navigate to entrance"""
-    return await set_navigation_goal(NavigationGoal(x=0.5, y=0.5))
+# Predefined navigation goals: (x, y, orientation_w)
+PREDEFINED_GOALS = {
+    "kitchen": (2.0, 1.0, 1.0),
+    "living_room": (1.0, 2.0, 1.0),
+    "bedroom": (3.0, 3.0, 1.0),
+    "entrance": (0.5, 0.5, 1.0)
+}
+
+# /goto responses never change, serialize them once at import
+_PREDEFINED_GOAL_BYTES = {
+    name: orjson.dumps({
+        "status": "success",
+        "message": f"Navigation goal set to ({x}, {y})",
+        "goal": {"x": x, "y": y, "orientation_w": orientation_w}
+    })
+    for name, (x, y, orientation_w) in PREDEFINED_GOALS.items()
+}
+
+@router.post("/goto/{location}")
+async def goto_location(location: str):
+    """Navigate to a predefined location (kitchen, living_room, bedroom, entrance)"""
+    goal = PREDEFINED_GOALS.get(location)
+    if goal is None:
+        raise HTTPException(status_code=404, detail=f"Unknown location '{location}'")
+    
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    
+    await run_in_threadpool(ros_bridge.publish_navigation_goal, *goal)
+    
+    return Response(content=_PREDEFINED_GOAL_BYTES[location], media_type="application/json")
 
 # Waypoint missions (future implementation)
 @router.post("/mission/start")
@@ -376,11 +449,11 @@ async def start_waypoint_mission(mission: WaypointMission):
     Start a waypoint mission (future implementation)
     """
     # This would integrate with mission planner node
-    return {
+    return json_response({
         "status": "not_implemented",
         "message": "Waypoint missions not yet implemented",
-        "mission": mission.dict()
-    }
+        "mission": mission.model_dump()
+    })
 
 @router.get("/mission/status")
 async def get_mission_status():
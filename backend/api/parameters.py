@@ -1,17 +1,24 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
+import asyncio
+import orjson
 import sys
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once, re-imports must not grow sys.path)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from ros_bridge.ros_interface_noetic import get_ros_bridge
+from api.responses import json_response, etag_for, cached_json_response
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Pydantic models
 class ParameterValue(BaseModel):
@@ -23,213 +30,191 @@ class ParameterValue(BaseModel):
 class ParameterUpdate(BaseModel):
     parameters: Dict[str, Any]
 
+class SingleParameterUpdate(BaseModel):
+    value: Any = None
+
 class NodeParameterResponse(BaseModel):
     node_name: str
     parameters: List[ParameterValue]
     timestamp: float
 
+async def _call_bridge(method: str, *args):
+    """
+    Run a ROS bridge method in the threadpool, 503 when the bridge is not available
+    """
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    
+    # ROS master and parameter server round trips must not block the event loop
+    return await run_in_threadpool(getattr(ros_bridge, method), *args)
+
 @router.get("/nodes")
 async def get_all_nodes_with_parameters():
     """
     Get list of all nodes that have parameters
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Get list of active nodes
-        nodes = ros_bridge.get_node_list()
-        
-        return {
-            "status": "success",
-            "nodes": nodes,
-            "count": len(nodes)
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get nodes: {str(e)}")
+    # Get list of active nodes
+    nodes = await _call_bridge("get_node_list")
+    
+    return json_response({
+        "status": "success",
+        "nodes": nodes,
+        "count": len(nodes)
+    })
 
 @router.get("/nodes/{node_name}")
 async def get_node_parameters(node_name: str):
     """
     Get all parameters for a specific node
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Get node parameters
-        parameters = ros_bridge.get_node_parameters(node_name)
-        
-        if parameters is None:
-            raise HTTPException(status_code=404, detail=f"Node '{node_name}' not found or has no parameters")
-        
-        return {
-            "status": "success",
-            "node_name": node_name,
-            "parameters": parameters
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get parameters for node '{node_name}': {str(e)}")
+    # Get node parameters
+    parameters = await _call_bridge("get_node_parameters", node_name)
+    
+    if parameters is None:
+        raise HTTPException(status_code=404, detail=f"Node '{node_name}' not found or has no parameters")
+    
+    return json_response({
+        "status": "success",
+        "node_name": node_name,
+        "parameters": parameters
+    })
 
 @router.post("/nodes/{node_name}")
 async def update_node_parameters(node_name: str, update: ParameterUpdate):
     """
     Update parameters for a specific node
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Update parameters
-        success = ros_bridge.set_node_parameters(node_name, update.parameters)
-        
-        if not success:
-            raise HTTPException(status_code=400, detail=f"Failed to update parameters for node '{node_name}'")
-        
-        return {
-            "status": "success",
-            "message": f"Parameters updated for node '{node_name}'",
-            "updated_parameters": update.parameters
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update parameters for node '{node_name}': {str(e)}")
+    # Update parameters
+    success = await _call_bridge("set_node_parameters", node_name, update.parameters)
+    
+    if not success:
+        raise HTTPException(status_code=400, detail=f"Failed to update parameters for node '{node_name}'")
+    
+    return {
+        "status": "success",
+        "message": f"Parameters updated for node '{node_name}'",
+        "updated_parameters": update.parameters
+    }
 
 @router.get("/nodes/{node_name}/parameter/{param_name}")
 async def get_specific_parameter(node_name: str, param_name: str):
     """
     Get a specific parameter value from a node
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Get specific parameter
-        value = ros_bridge.get_node_parameter(node_name, param_name)
-        
-        if value is None:
-            raise HTTPException(status_code=404, detail=f"Parameter '{param_name}' not found in node '{node_name}'")
-        
-        return {
-            "status": "success",
-            "node_name": node_name,
-            "parameter_name": param_name,
-            "value": value
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get parameter '{param_name}' from node '{node_name}': {str(e)}")
+    # Get specific parameter
+    value = await _call_bridge("get_node_parameter", node_name, param_name)
+    
+    if value is None:
+        raise HTTPException(status_code=404, detail=f"Parameter '{param_name}' not found in node '{node_name}'")
+    
+    return {
+        "status": "success",
+        "node_name": node_name,
+        "parameter_name": param_name,
+        "value": value
+    }
 
 @router.post("/nodes/{node_name}/parameter/{param_name}")
-async def update_specific_parameter(node_name: str, param_name: str, value: Dict[str, Any]):
+async def update_specific_parameter(node_name: str, param_name: str, update: SingleParameterUpdate):
     """
     Update a specific parameter in a node
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Update specific parameter
-        success = ros_bridge.set_node_parameter(node_name, param_name, value.get('value'))
-        
-        if not success:
-            raise HTTPException(status_code=400, detail=f"Failed to update parameter '{param_name}' in node '{node_name}'")
-        
-        return {
-            "status": "success",
-            "message": f"Parameter '{param_name}' updated in node '{node_name}'",
-            "parameter_name": param_name,
-            "new_value": value.get('value')
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update parameter '{param_name}' in node '{node_name}': {str(e)}")
+    # Update specific parameter
+    success = await _call_bridge("set_node_parameter", node_name, param_name, update.value)
+    
+    if not success:
+        raise HTTPException(status_code=400, detail=f"Failed to update parameter '{param_name}' in node '{node_name}'")
+    
+    return {
+        "status": "success",
+        "message": f"Parameter '{param_name}' updated in node '{node_name}'",
+        "parameter_name": param_name,
+        "new_value": update.value
+    }
 
 # Predefined parameter presets
+PARAMETER_PRESETS = {
+    "navigation_conservative": {
+        "description": "Conservative navigation settings for safe indoor movement",
+        "parameters": {
+            "max_vel_x": 0.2,
+            "max_vel_theta": 0.5,
+            "min_obstacle_dist": 0.5,
+            "inflation_radius": 0.3
+        }
+    },
+    "navigation_aggressive": {
+        "description": "Aggressive navigation settings for faster movement",
+        "parameters": {
+            "max_vel_x": 0.5,
+            "max_vel_theta": 1.0,
+            "min_obstacle_dist": 0.3,
+            "inflation_radius": 0.2
+        }
+    },
+    "localization_precise": {
+        "description": "High precision localization settings",
+        "parameters": {
+            "min_particles": 500,
+            "max_particles": 2000,
+            "update_min_d": 0.1,
+            "update_min_a": 0.1
+        }
+    }
+}
+
+# Static /presets response, serialized once at import
+_PRESETS_BYTES = orjson.dumps({
+    "status": "success",
+    "presets": PARAMETER_PRESETS
+})
+_PRESETS_ETAG = etag_for(_PRESETS_BYTES)
+
 @router.get("/presets")
-async def get_parameter_presets():
+async def get_parameter_presets(request: Request):
     """
     Get predefined parameter presets for common configurations
     """
-    presets = {
-        "navigation_conservative": {
-            "description": "Conservative navigation settings for safe indoor movement",
-            "parameters": {
-                "max_vel_x": 0.2,
-                "max_vel_theta": 0.5,
-                "min_obstacle_dist": 0.5,
-                "inflation_radius": 0.3
-            }
-        },
-        "navigation_aggressive": {
-            "description": "Aggressive navigation settings for faster movement",
-            "parameters": {
-                "max_vel_x": 0.5,
-                "max_vel_theta": 1.0,
-                "min_obstacle_dist": 0.3,
-                "inflation_radius": 0.2
-            }
-        },
-        "localization_precise": {
-            "description": "High precision localization settings",
-            "parameters": {
-                "min_particles": 500,
-                "max_particles": 2000,
-                "update_min_d": 0.1,
-                "update_min_a": 0.1
-            }
-        }
-    }
-    
-    return {
-        "status": "success",
-        "presets": presets
-    }
+    # Presets only change with a deploy, the ETag covers that case
+    return cached_json_response(request, _PRESETS_BYTES, _PRESETS_ETAG, headers={
+        "Cache-Control": "public, max-age=3600"
+    })
 
 @router.post("/presets/{preset_name}/apply")
 async def apply_parameter_preset(preset_name: str, target_nodes: Optional[List[str]] = None):
     """
     Apply a parameter preset to specified nodes
     """
-    try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        # Get preset configuration
-        presets_response = await get_parameter_presets()
-        presets = presets_response["presets"]
-        
-        if preset_name not in presets:
-            raise HTTPException(status_code=404, detail=f"Preset '{preset_name}' not found")
-        
-        preset = presets[preset_name]
-        
-        # Apply to target nodes or auto-detect
-        if not target_nodes:
-            target_nodes = ["navigation_node", "localization_node"]  # Default nodes
-        
-        results = {}
-        for node_name in target_nodes:
-            try:
-                success = ros_bridge.set_node_parameters(node_name, preset["parameters"])
-                results[node_name] = "success" if success else "failed"
-            except Exception as e:
-                results[node_name] = f"error: {str(e)}"
-        
-        return {
-            "status": "success",
-            "preset_name": preset_name,
-            "applied_to": target_nodes,
-            "results": results
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to apply preset '{preset_name}': {str(e)}")
+    ros_bridge = get_ros_bridge()
+    if not ros_bridge:
+        raise HTTPException(status_code=503, detail="ROS2 bridge not available")
+    
+    # Get preset configuration
+    preset = PARAMETER_PRESETS.get(preset_name)
+    if preset is None:
+        raise HTTPException(status_code=404, detail=f"Preset '{preset_name}' not found")
+    
+    # Apply to target nodes or auto-detect
+    if not target_nodes:
+        target_nodes = ["navigation_node", "localization_node"]  # Default nodes
+    
+    # Apply to all nodes concurrently, a failure on one node does not stop the others
+    outcomes = await asyncio.gather(
+        *(run_in_threadpool(ros_bridge.set_node_parameters, node_name, preset["parameters"]) for node_name in target_nodes),
+        return_exceptions=True
+    )
+    
+    results = {}
+    for node_name, outcome in zip(target_nodes, outcomes):
+        if isinstance(outcome, Exception):
+            results[node_name] = f"error: {str(outcome)}"
+        else:
+            results[node_name] = "success" if outcome else "failed"
+    
+    return {
+        "status": "success",
+        "preset_name": preset_name,
+        "applied_to": target_nodes,
+        "results": results
+    }
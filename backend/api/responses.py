@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+from fastapi import Request, Response
+from typing import Dict, Optional
+import hashlib
+import orjson
+
+# MessagePack is optional, endpoints answer with JSON only without it
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+def json_response(data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serialize data with orjson straight into a Response, skipping jsonable_encoder
+    """
+    return Response(
+        content=orjson.dumps(data, default=str, option=orjson.OPT_SERIALIZE_NUMPY),
+        status_code=status,
+        media_type="application/json",
+        headers=headers
+    )
+
+# State GETs may be cached by clients but must be revalidated with their ETag
+REVALIDATE_HEADERS = {"Cache-Control": "no-cache"}
+
+def _msgpack_default(obj):
+    """Pack numpy arrays and scalars as plain values, anything else as its string"""
+    return obj.tolist() if hasattr(obj, 'tolist') else str(obj)
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    Whether the client opted into MessagePack through its Accept header
+    """
+    return MSGPACK_AVAILABLE and "application/msgpack" in request.headers.get("accept", "")
+
+def msgpack_bytes(data) -> bytes:
+    """
+    MessagePack encoding shared by the HTTP responses and WebSocket streams
+    """
+    return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+
+def msgpack_response(data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serialize data as MessagePack, for clients that asked for it with wants_msgpack
+    """
+    return Response(
+        content=msgpack_bytes(data),
+        status_code=status,
+        media_type="application/msgpack",
+        headers=headers
+    )
+
+def etag_for(content: bytes) -> str:
+    """
+    Strong ETag of a serialized response body
+    """
+    return '"' + hashlib.md5(content).hexdigest() + '"'
+
+def not_modified(request: Request, etag: str, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """
+    Empty 304 response if the client already holds etag, otherwise None
+    """
+    if request.headers.get("if-none-match") != etag:
+        return None
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
+
+def cached_json_response(request: Request, content: bytes, etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Pre-serialized JSON body with its ETag, or a 304 when the client is up to date
+    """
+    headers = {"ETag": etag, **(headers or {})}
+    return not_modified(request, etag, headers) or Response(
+        content=content,
+        media_type="application/json",
+        headers=headers
+    )
@@ -1,17 +1,24 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
+import orjson
 import sys
 import logging
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once, re-imports must not grow sys.path)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from ros_bridge.ros_interface_noetic import get_ros_bridge
+from api.dependencies import require_ros_bridge
+from api.latest_data import cached_latest_data, cached_latest_bulk
 from security.auth import require_control, require_read
+from api.responses import etag_for, cached_json_response, REVALIDATE_HEADERS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -43,16 +50,14 @@ class RobotStatus(BaseModel):
     timestamp: float
 
 @router.post("/move")
-async def move_robot(command: MoveCommand, current_user: dict = Depends(require_control)):
+async def move_robot(command: MoveCommand, current_user: dict = Depends(require_control), ros_bridge=Depends(require_ros_bridge)):
     """
     Send velocity command to robot
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        ros_bridge.publish_cmd_vel(
+        # rospy publishes write to subscriber sockets, keep them off the event loop
+        await run_in_threadpool(
+            ros_bridge.publish_cmd_vel,
             command.linear_x,
             command.linear_y, 
             command.angular_z
@@ -61,23 +66,19 @@ async def move_robot(command: MoveCommand, current_user: dict = Depends(require_
         return {
             "status": "success",
             "message": f"Move command sent: linear=({command.linear_x}, {command.linear_y}), angular={command.angular_z}",
-            "command": command.dict()
+            "command": command.model_dump()
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send move command: {str(e)}")
 
 @router.post("/stop")
-async def stop_robot():
+async def stop_robot(ros_bridge=Depends(require_ros_bridge)):
     """
     Emergency stop - send zero velocity
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        ros_bridge.publish_cmd_vel(0.0, 0.0, 0.0)
+        await run_in_threadpool(ros_bridge.publish_cmd_vel, 0.0, 0.0, 0.0)
         
         return {
             "status": "success",
@@ -89,16 +90,12 @@ async def stop_robot():
         raise HTTPException(status_code=500, detail=f"Failed to stop robot: {str(e)}")
 
 @router.post("/home")
-async def go_home():
+async def go_home(ros_bridge=Depends(require_ros_bridge)):
     """
     Send robot to home position (0, 0)
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        ros_bridge.publish_navigation_goal(0.0, 0.0, 1.0)
+        await run_in_threadpool(ros_bridge.publish_navigation_goal, 0.0, 0.0, 1.0)
         
         return {
             "status": "success",
@@ -110,37 +107,29 @@ async def go_home():
         raise HTTPException(status_code=500, detail=f"Failed to send home command: {str(e)}")
 
 @router.post("/set_initial_pose")
-async def set_initial_pose(pose: PoseCommand):
+async def set_initial_pose(pose: PoseCommand, ros_bridge=Depends(require_ros_bridge)):
     """
     Set initial pose for AMCL localization
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        ros_bridge.publish_initial_pose(pose.x, pose.y, pose.orientation_w)
+        await run_in_threadpool(ros_bridge.publish_initial_pose, pose.x, pose.y, pose.orientation_w)
         
         return {
             "status": "success",
             "message": f"Initial pose set to ({pose.x}, {pose.y})",
-            "pose": pose.dict()
+            "pose": pose.model_dump()
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set initial pose: {str(e)}")
 
 @router.get("/pose")
-async def get_robot_pose():
+async def get_robot_pose(ros_bridge=Depends(require_ros_bridge)):
     """
     Get current robot pose
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        pose_data = ros_bridge.get_latest_data('pose')
+        pose_data = cached_latest_data(ros_bridge, 'pose')
         
         if pose_data is None:
             return {
@@ -158,65 +147,83 @@ async def get_robot_pose():
         raise HTTPException(status_code=500, detail=f"Failed to get robot pose: {str(e)}")
 
 @router.get("/status")
-async def get_robot_status(current_user: dict = Depends(require_read)):
+async def get_robot_status(current_user: dict = Depends(require_read), ros_bridge=Depends(require_ros_bridge)):
     """
     Get comprehensive robot status
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
         # Get all latest data
-        pose_data = ros_bridge.get_latest_data('pose')
-        odom_data = ros_bridge.get_latest_data('odom')
-        battery_data = ros_bridge.get_latest_data('battery')
+        latest = cached_latest_bulk(ros_bridge, ['pose', 'odom', 'battery'])
         
         status = RobotStatus(
-            pose=pose_data,
-            odom=odom_data,
-            battery=battery_data,
+            pose=latest['pose'],
+            odom=latest['odom'],
+            battery=latest['battery'],
             timestamp=ros_bridge.get_clock().now().nanoseconds / 1e9 if hasattr(ros_bridge, 'get_clock') else 0
         )
         
         return {
             "status": "success",
-            "robot_status": status.dict()
+            "robot_status": status.model_dump()
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get robot status: {str(e)}")
 
-# Predefined movement commands
+# Predefined movement commands: (linear_x, linear_y, angular_z)
+PRESET_MOVES = {
+    "forward": (0.2, 0.0, 0.0),
+    "backward": (-0.2, 0.0, 0.0),
+    "left": (0.0, 0.2, 0.0),
+    "right": (0.0, -0.2, 0.0),
+    "rotate_left": (0.0, 0.0, 0.5),
+    "rotate_right": (0.0, 0.0, -0.5)
+}
+
+# Preset responses never change, serialize them once at import (same body as /move)
+_PRESET_MOVE_BYTES = {
+    name: orjson.dumps({
+        "status": "success",
+        "message": f"Move command sent: linear=({linear_x}, {linear_y}), angular={angular_z}",
+        "command": {"linear_x": linear_x, "linear_y": linear_y, "angular_z": angular_z, "duration": None}
+    })
+    for name, (linear_x, linear_y, angular_z) in PRESET_MOVES.items()
+}
+
+async def _send_preset_move(ros_bridge, name: str) -> Response:
+    """Publish a predefined velocity command and return its prebuilt response"""
+    await run_in_threadpool(ros_bridge.publish_cmd_vel, *PRESET_MOVES[name])
+    return Response(content=_PRESET_MOVE_BYTES[name], media_type="application/json")
+
 @router.post("/move/forward")
-async def move_forward():
+async def move_forward(ros_bridge=Depends(require_ros_bridge)):
     """Move robot forward"""
-    return await move_robot(MoveCommand(linear_x=0.2))
+    return await _send_preset_move(ros_bridge, "forward")
 
 @router.post("/move/backward")
-async def move_backward():
+async def move_backward(ros_bridge=Depends(require_ros_bridge)):
     """Move robot backward"""
-    return await move_robot(MoveCommand(linear_x=-0.2))
+    return await _send_preset_move(ros_bridge, "backward")
 
 @router.post("/move/left")
-async def move_left():
+async def move_left(ros_bridge=Depends(require_ros_bridge)):
     """Move robot left"""
-    return await move_robot(MoveCommand(linear_y=0.2))
+    return await _send_preset_move(ros_bridge, "left")
 
 @router.post("/move/right")
-async def move_right():
+async def move_right(ros_bridge=Depends(require_ros_bridge)):
     """Move robot right"""
-    return await move_robot(MoveCommand(linear_y=-0.2))
+    return await _send_preset_move(ros_bridge, "right")
 
 @router.post("/rotate/left")
-async def rotate_left():
+async def rotate_left(ros_bridge=Depends(require_ros_bridge)):
     """Rotate robot left"""
-    return await move_robot(MoveCommand(angular_z=0.5))
+    return await _send_preset_move(ros_bridge, "rotate_left")
 
 @router.post("/rotate/right")
-async def rotate_right():
+async def rotate_right(ros_bridge=Depends(require_ros_bridge)):
     """Rotate robot right"""
-    return await move_robot(MoveCommand(angular_z=-0.5))
+    return await _send_preset_move(ros_bridge, "rotate_right")
 
 # Global state for robot running mode switching
 running_mode_state = {
@@ -240,21 +247,28 @@ running_mode_state = {
     }
 }
 
+# Serialized /running-mode response, rebuilt on the first GET after a mode change
+_running_mode_bytes: Optional[bytes] = None
+_running_mode_etag = ""
+
 @router.get("/running-mode")
-async def get_running_mode():
+async def get_running_mode(request: Request):
     """
     Get current robot running mode configuration
     """
-    try:
-        return {
+    global _running_mode_bytes, _running_mode_etag
+    if _running_mode_bytes is None:
+        current_mode = running_mode_state["current_mode"]
+        _running_mode_bytes = orjson.dumps({
             "status": "success",
-            "current_mode": running_mode_state["current_mode"],
+            "current_mode": current_mode,
             "available_modes": running_mode_state["available_modes"],
             "description": running_mode_state["description"],
-            "config": running_mode_state["mode_config"][running_mode_state["current_mode"]]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get running mode: {str(e)}")
+            "config": running_mode_state["mode_config"][current_mode]
+        })
+        _running_mode_etag = etag_for(_running_mode_bytes)
+    
+    return cached_json_response(request, _running_mode_bytes, _running_mode_etag, headers=REVALIDATE_HEADERS)
 
 @router.post("/running-mode")
 async def set_running_mode(request: dict):
@@ -274,15 +288,17 @@ async def set_running_mode(request: dict):
             )
 
         # Update the state
+        global _running_mode_bytes
         old_mode = running_mode_state["current_mode"]
         running_mode_state["current_mode"] = new_mode
+        _running_mode_bytes = None
 
         # Get ROS bridge and update behavior if needed
         ros_bridge = get_ros_bridge()
         if ros_bridge:
             # Update the running mode in ROS bridge
             mode_config = running_mode_state["mode_config"][new_mode]
-            ros_bridge.set_running_mode(new_mode, mode_config)
+            await run_in_threadpool(ros_bridge.set_running_mode, new_mode, mode_config)
 
         logger.info(f"Running mode switched from {old_mode} to {new_mode}")
 
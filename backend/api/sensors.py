@@ -1,17 +1,102 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from functools import lru_cache
+import asyncio
+import base64
+import logging
+import numpy as np
+import orjson
 import sys
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once, re-imports must not grow sys.path)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from ros_bridge.ros_interface_noetic import get_ros_bridge
+from api.dependencies import require_ros_bridge
+from api.latest_data import cached_latest_data, cached_latest_bulk
+from api.responses import json_response, wants_msgpack, msgpack_response, msgpack_bytes, MSGPACK_AVAILABLE
 
-router = APIRouter()
+# Numba is optional, obstacle extraction stays on NumPy without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+# Obstacles are LiDAR returns closer than this (meters)
+OBSTACLE_MAX_RANGE = 2.0
+
+# How often /scan/stream looks for a new scan, well above the LiDAR publish rate
+SCAN_STREAM_POLL_INTERVAL = 0.02
+
+# Packed /scan ranges: uint16 millimeters, with this value for missing returns
+PACKED_RANGE_SCALE = 0.001
+PACKED_RANGE_INVALID = 65535
+
+@lru_cache(maxsize=4)
+def _trig_tables(angle_min: float, inc: float, n: int):
+    """
+    Read-only (angles, cos, sin) per beam for one scan geometry, which is fixed per LiDAR
+    """
+    angles = angle_min + np.arange(n) * inc
+    tables = (angles, np.cos(angles), np.sin(angles))
+    for table in tables:
+        table.setflags(write=False)
+    return tables
+
+# No nnan/ninf fast-math flags: ranges carry NaN for missing returns.
+# Serial on purpose, thread start-up costs more than a scan's few thousand beams
+@njit(fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}, cache=True)
+def _obstacles_kernel(ranges, angles, cos_table, sin_table, max_r):
+    """
+    Packed (x, y, distance, angle) columns of the beams closer than max_r
+    """
+    beams = np.flatnonzero(ranges < max_r)
+    count = beams.shape[0]
+    x = np.empty(count)
+    y = np.empty(count)
+    distance = np.empty(count)
+    angle = np.empty(count)
+    for i in range(count):
+        beam = beams[i]
+        r = ranges[beam]
+        x[i] = r * cos_table[beam]
+        y[i] = r * sin_table[beam]
+        distance[i] = r
+        angle[i] = angles[beam]
+    return x, y, distance, angle
+
+def _extract_obstacles(ranges: np.ndarray, angle_min: float, inc: float, max_r: float):
+    """
+    Obstacle columns from the compiled kernel, or NumPy when Numba is missing
+    """
+    angles, cos_table, sin_table = _trig_tables(float(angle_min), float(inc), ranges.shape[0])
+    if NUMBA_AVAILABLE:
+        return _obstacles_kernel(ranges, angles, cos_table, sin_table, float(max_r))
+    
+    beams = np.flatnonzero(ranges < max_r)  # NaN never matches
+    distance = ranges[beams]
+    return distance * cos_table[beams], distance * sin_table[beams], distance, angles[beams]
+
+# Compile at import so the first request does not pay for the JIT
+if NUMBA_AVAILABLE:
+    _extract_obstacles(np.zeros(1), 0.0, 0.0, OBSTACLE_MAX_RANGE)
+    _trig_tables.cache_clear()
 
 # Pydantic models
 class SensorReading(BaseModel):
@@ -30,16 +115,16 @@ class LidarData(BaseModel):
     timestamp: float
 
 @router.get("/scan")
-async def get_lidar_scan():
+async def get_lidar_scan(
+    request: Request,
+    format: str = Query("json", description="Response format: json, packed (base64 uint16 millimeter ranges)"),
+    ros_bridge=Depends(require_ros_bridge)
+):
     """
     Get latest LiDAR scan data
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        scan_data = ros_bridge.get_latest_data('scan')
+        scan_data = cached_latest_data(ros_bridge, 'scan')
         
         if scan_data is None:
             return {
@@ -48,25 +133,91 @@ async def get_lidar_scan():
                 "scan": None
             }
         
-        return {
+        # Packed scans carry the ranges as one base64 string of uint16 millimeters.
+        # Clients decode with new Uint16Array(bytes.buffer), skip ranges_invalid
+        # and multiply the rest by ranges_scale to get meters
+        ranges = scan_data.get('ranges')
+        if ranges is not None and format.lower() == "packed":
+            meters = np.array(ranges, dtype=np.float64)  # None becomes NaN
+            millimeters = np.full(meters.shape, PACKED_RANGE_INVALID, dtype='<u2')
+            valid = np.isfinite(meters)
+            millimeters[valid] = np.clip(np.rint(meters[valid] / PACKED_RANGE_SCALE), 0, PACKED_RANGE_INVALID - 1)
+            
+            packed_scan = {key: value for key, value in scan_data.items() if key != 'ranges'}
+            packed_scan['ranges_dtype'] = "uint16"
+            packed_scan['ranges_scale'] = PACKED_RANGE_SCALE
+            packed_scan['ranges_invalid'] = PACKED_RANGE_INVALID
+            packed_scan['ranges_b64'] = base64.b64encode(millimeters.tobytes()).decode('ascii')
+            return json_response({
+                "status": "success",
+                "scan": packed_scan
+            }, headers={"Vary": "Accept"})
+        
+        # Realtime clients can opt into MessagePack, others get orjson without jsonable_encoder
+        if wants_msgpack(request):
+            return msgpack_response({
+                "status": "success",
+                "scan": scan_data
+            }, headers={"Vary": "Accept"})
+        
+        return json_response({
             "status": "success",
             "scan": scan_data
-        }
+        }, headers={"Vary": "Accept"})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get LiDAR scan: {str(e)}")
 
+async def _wait_for_disconnect(websocket: WebSocket):
+    """
+    Return once the client closes the WebSocket, ignoring anything it sends
+    """
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+@router.websocket("/scan/stream")
+async def stream_lidar_scans(websocket: WebSocket, format: str = "json"):
+    """
+    Push each new LiDAR scan over one WebSocket instead of polling /scan
+    """
+    await websocket.accept()
+    use_msgpack = MSGPACK_AVAILABLE and format.lower() == "msgpack"
+    last_scan = None
+    
+    # Clients only listen, the receive side is watched just to notice them leaving
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    
+    try:
+        while not disconnected.done():
+            ros_bridge = get_ros_bridge()
+            scan_data = cached_latest_data(ros_bridge, 'scan') if ros_bridge else None
+            
+            # Every scan from the bridge is a new dict, so identity tells new frames apart.
+            # The next read only happens once the previous send finished, which drops
+            # the frames a slow client could not keep up with instead of queueing them
+            if scan_data is not None and scan_data is not last_scan:
+                last_scan = scan_data
+                if use_msgpack:
+                    await websocket.send_bytes(msgpack_bytes(scan_data))
+                else:
+                    await websocket.send_text(orjson.dumps(scan_data, default=str).decode())
+            
+            await asyncio.wait({disconnected}, timeout=SCAN_STREAM_POLL_INTERVAL)
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"LiDAR scan stream error: {e}")
+    finally:
+        disconnected.cancel()
+
 @router.get("/ultrasonic")
-async def get_ultrasonic_data():
+async def get_ultrasonic_data(ros_bridge=Depends(require_ros_bridge)):
     """
     Get latest ultrasonic sensor data
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        ultrasonic_data = ros_bridge.get_latest_data('ultrasonic')
+        ultrasonic_data = cached_latest_data(ros_bridge, 'ultrasonic')
         
         if ultrasonic_data is None:
             return {
@@ -84,16 +235,12 @@ async def get_ultrasonic_data():
         raise HTTPException(status_code=500, detail=f"Failed to get ultrasonic data: {str(e)}")
 
 @router.get("/battery")
-async def get_battery_status():
+async def get_battery_status(ros_bridge=Depends(require_ros_bridge)):
     """
     Get battery status
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        battery_data = ros_bridge.get_latest_data('battery')
+        battery_data = cached_latest_data(ros_bridge, 'battery')
         
         if battery_data is None:
             return {
@@ -111,43 +258,33 @@ async def get_battery_status():
         raise HTTPException(status_code=500, detail=f"Failed to get battery status: {str(e)}")
 
 @router.get("/all")
-async def get_all_sensor_data():
+async def get_all_sensor_data(ros_bridge=Depends(require_ros_bridge)):
     """
     Get all sensor data in one request
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
         # Get all sensor data
-        scan_data = ros_bridge.get_latest_data('scan')
-        ultrasonic_data = ros_bridge.get_latest_data('ultrasonic')
-        battery_data = ros_bridge.get_latest_data('battery')
+        sensor_data = cached_latest_bulk(ros_bridge, ['scan', 'ultrasonic', 'battery'])
         
-        return {
+        return json_response({
             "status": "success",
             "sensors": {
-                "lidar": scan_data,
-                "ultrasonic": ultrasonic_data,
-                "battery": battery_data
+                "lidar": sensor_data['scan'],
+                "ultrasonic": sensor_data['ultrasonic'],
+                "battery": sensor_data['battery']
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get sensor data: {str(e)}")
 
 @router.get("/scan/obstacles")
-async def get_obstacles():
+async def get_obstacles(ros_bridge=Depends(require_ros_bridge)):
     """
     Get detected obstacles from LiDAR scan
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        scan_data = ros_bridge.get_latest_data('scan')
+        scan_data = cached_latest_data(ros_bridge, 'scan')
         
         if scan_data is None:
             return {
@@ -156,45 +293,38 @@ async def get_obstacles():
                 "obstacles": []
             }
         
-        # Process scan data to find obstacles
-        obstacles = []
-        ranges = scan_data.get('ranges', [])
-        angle_min = scan_data.get('angle_min', 0)
-        angle_increment = scan_data.get('angle_increment', 0)
-        
-        for i, range_val in enumerate(ranges):
-            if range_val is not None and range_val < 2.0:  # Obstacles within 2m
-                angle = angle_min + i * angle_increment
-                x = range_val * cos(angle)
-                y = range_val * sin(angle)
-                
-                obstacles.append({
-                    "x": x,
-                    "y": y,
-                    "distance": range_val,
-                    "angle": angle
-                })
+        # Process scan data to find obstacles, over the whole scan at once
+        ranges = np.array(scan_data.get('ranges', []), dtype=np.float64)  # None becomes NaN
+        columns = _extract_obstacles(
+            ranges,
+            scan_data.get('angle_min', 0),
+            scan_data.get('angle_increment', 0),
+            OBSTACLE_MAX_RANGE
+        )
         
-        return {
+        obstacles = [
+            {"x": x, "y": y, "distance": distance, "angle": angle}
+            for x, y, distance, angle in zip(*(column.tolist() for column in columns))
+        ]
+        
+        return json_response({
             "status": "success",
             "obstacles": obstacles,
             "count": len(obstacles)
-        }
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process obstacles: {str(e)}")
 
 @router.get("/scan/summary")
-async def get_scan_summary():
+async def get_scan_summary(ros_bridge=Depends(require_ros_bridge)):
     """
     Get summary statistics of LiDAR scan
     """
     try:
-        ros_bridge = get_ros_bridge()
-        if not ros_bridge:
-            raise HTTPException(status_code=503, detail="ROS2 bridge not available")
-        
-        scan_data = ros_bridge.get_latest_data('scan')
+        scan_data = cached_latest_data(ros_bridge, 'scan')
         
         if scan_data is None:
             return {
@@ -203,14 +333,14 @@ async def get_scan_summary():
                 "summary": None
             }
         
-        ranges = scan_data.get('ranges', [])
-        valid_ranges = [r for r in ranges if r is not None and not float('inf') == r]
+        ranges = np.array(scan_data.get('ranges', []), dtype=np.float64)  # None becomes NaN
+        valid_ranges = ranges[np.isfinite(ranges)]
         
-        if not valid_ranges:
+        if not valid_ranges.size:
             return {
                 "status": "success",
                 "summary": {
-                    "total_points": len(ranges),
+                    "total_points": ranges.size,
                     "valid_points": 0,
                     "min_distance": None,
                     "max_distance": None,
@@ -219,18 +349,13 @@ async def get_scan_summary():
                 }
             }
         
-        min_dist = min(valid_ranges)
-        max_dist = max(valid_ranges)
-        avg_dist = sum(valid_ranges) / len(valid_ranges)
-        close_obstacles = len([r for r in valid_ranges if r < 1.0])
-        
         summary = {
-            "total_points": len(ranges),
-            "valid_points": len(valid_ranges),
-            "min_distance": min_dist,
-            "max_distance": max_dist,
-            "avg_distance": avg_dist,
-            "obstacles_close": close_obstacles,
+            "total_points": ranges.size,
+            "valid_points": valid_ranges.size,
+            "min_distance": valid_ranges.min().item(),
+            "max_distance": valid_ranges.max().item(),
+            "avg_distance": valid_ranges.mean().item(),
+            "obstacles_close": int(np.count_nonzero(valid_ranges < 1.0)),
             "timestamp": scan_data.get('timestamp')
         }
         
@@ -241,12 +366,3 @@ async def get_scan_summary():
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get scan summary: {str(e)}")
-
-# Helper function for obstacle detection
-def cos(angle):
-    import math
-    return math.cos(angle)
-
-def sin(angle):
-    import math
-    return math.sin(angle)
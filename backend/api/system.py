@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import sys
 import psutil
 import time
-import subprocess
-import json
 import os
 import signal
-import yaml
 import logging
 from pathlib import Path
 
@@ -18,8 +18,27 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from ros_bridge.ros_interface_noetic import get_ros_bridge
+from api.dependencies import require_ros_bridge
+from services import sampler
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Fixed for the lifetime of the process, read once instead of per request
+_BOOT_TIME = psutil.boot_time()
+_CPU_COUNT = psutil.cpu_count()
+
+# The current clock does move with frequency scaling, so it is re-read now and then.
+# Cheap on Linux (sysfs), but macOS and the BSDs go through sysctl
+CPU_FREQ_REFRESH_INTERVAL = 60.0
+_cpu_freq_cache = (float('-inf'), None)
+
+def _cpu_freq():
+    """psutil.cpu_freq(), re-read at most every CPU_FREQ_REFRESH_INTERVAL seconds"""
+    global _cpu_freq_cache
+    now = time.monotonic()
+    if now - _cpu_freq_cache[0] >= CPU_FREQ_REFRESH_INTERVAL:
+        _cpu_freq_cache = (now, psutil.cpu_freq())
+    return _cpu_freq_cache[1]
 
 # Pydantic models
 class SystemInfo(BaseModel):
@@ -34,6 +53,64 @@ class NodeStatus(BaseModel):
     status: str
     timestamp: float
 
+def _ros_processes() -> List[Dict[str, Any]]:
+    """
+    pid, name, CPU and memory share of the processes with 'ros' in their name
+    """
+    processes = []
+    # Only the name is read for every PID, the rest just for the matching ones
+    for proc in psutil.process_iter(['name']):
+        name = proc.info['name']
+        if not name or 'ros' not in name.lower():
+            continue
+        try:
+            # One read of the /proc files for both counters
+            with proc.oneshot():
+                processes.append({
+                    "pid": proc.pid,
+                    "name": name,
+                    "cpu_percent": proc.cpu_percent(interval=None),
+                    "memory_percent": proc.memory_percent()
+                })
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return processes
+
+# Launch commands for the nodes /nodes/{node_name}/start knows about
+NODE_LAUNCH_COMMANDS = {
+    "navigation": ("ros2", "launch", "indoor_navigation", "navigation.launch.py"),
+    "slam": ("ros2", "launch", "slam_toolbox", "online_async_launch.py"),
+    "localization": ("ros2", "launch", "indoor_navigation", "localization.launch.py"),
+    "perception": ("ros2", "launch", "perception_system", "perception.launch.py"),
+    "safety_monitor": ("ros2", "run", "safety_monitor", "safety_monitor"),
+    "mission_planner": ("ros2", "run", "mission_planner", "mission_planner"),
+    "web_interface": ("ros2", "run", "web_interface", "web_server")
+}
+
+# Node name -> process started by /nodes/{node_name}/start, each leading its own process group
+_launched_nodes: Dict[str, asyncio.subprocess.Process] = {}
+
+def _find_processes(pattern: str) -> List[psutil.Process]:
+    """
+    Processes whose command line contains pattern, like pgrep -f (never this server)
+    """
+    own_pid = os.getpid()
+    matches = []
+    for proc in psutil.process_iter(['cmdline']):
+        cmdline = proc.info['cmdline']
+        if cmdline and proc.pid != own_pid and pattern in ' '.join(cmdline):
+            matches.append(proc)
+    return matches
+
+def prime_ros_process_cpu():
+    """
+    Called at app startup so the first /performance request does not report 0% for every ROS process
+    """
+    # process_iter keeps its Process objects between calls, so this primes their CPU counters.
+    # Those objects are shared with diagnostics /processes: each endpoint's cpu_percent()
+    # measures since whichever of the two read the process last
+    _ros_processes()
+
 @router.get("/status")
 async def get_system_status():
     """
@@ -42,12 +119,12 @@ async def get_system_status():
     try:
         ros_bridge = get_ros_bridge()
         
-        # System metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        boot_time = psutil.boot_time()
-        uptime = time.time() - boot_time
+        # System metrics, from the background sampler instead of a blocking 1s read
+        snapshot = sampler.get()
+        cpu_percent = snapshot["cpu_percent"]
+        memory = snapshot["memory"]
+        disk = snapshot["disk"]
+        uptime = time.time() - _BOOT_TIME
         
         # ROS2 status
         ros_status = "connected" if ros_bridge else "disconnected"
@@ -155,23 +232,21 @@ async def get_system_logs(limit: int = 100):
         if not ros_bridge:
             raise HTTPException(status_code=503, detail="ROS2 bridge not available")
         
-        logs_data = ros_bridge.get_latest_data('logs')
+        # Only the last 'limit' logs are copied out of the bridge
+        recent_logs, total_logs = ros_bridge.get_recent('logs', limit)
         
-        if logs_data is None:
+        if recent_logs is None:
             return {
                 "status": "no_data",
                 "message": "No logs data available",
                 "logs": []
             }
         
-        # Return last 'limit' logs
-        recent_logs = logs_data[-limit:] if len(logs_data) > limit else logs_data
-        
         return {
             "status": "success",
             "logs": recent_logs,
             "count": len(recent_logs),
-            "total_logs": len(logs_data)
+            "total_logs": total_logs
         }
         
     except Exception as e:
@@ -184,35 +259,26 @@ async def get_performance_metrics():
     """
     try:
         # CPU information
-        cpu_count = psutil.cpu_count()
-        cpu_freq = psutil.cpu_freq()
+        cpu_count = _CPU_COUNT
+        cpu_freq = _cpu_freq()
         cpu_percent_per_core = psutil.cpu_percent(percpu=True)
         
-        # Memory information
-        memory = psutil.virtual_memory()
+        # Memory, disk and network information from the background sampler
+        snapshot = sampler.get()
+        memory = snapshot["memory"]
         swap = psutil.swap_memory()
-        
-        # Disk information
-        disk = psutil.disk_usage('/')
-        disk_io = psutil.disk_io_counters()
-        
-        # Network information
-        network_io = psutil.net_io_counters()
+        disk = snapshot["disk"]
+        disk_io = snapshot["disk_io"]
+        network_io = snapshot["network_io"]
         
         # Process information
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                if proc.info['name'] and 'ros' in proc.info['name'].lower():
-                    processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        processes = _ros_processes()
         
         performance = {
             "cpu": {
                 "count": cpu_count,
                 "frequency": cpu_freq._asdict() if cpu_freq else None,
-                "percent_total": psutil.cpu_percent(),
+                "percent_total": snapshot["cpu_percent"],
                 "percent_per_core": cpu_percent_per_core
             },
             "memory": {
@@ -256,32 +322,20 @@ async def start_ros_node(node_name: str):
     Start a specific ROS2 node or launch file
     """
     try:
-        import subprocess
-        import os
-
-        # Define launch commands for different nodes
-        launch_commands = {
-            "navigation": ["ros2", "launch", "indoor_navigation", "navigation.launch.py"],
-            "slam": ["ros2", "launch", "slam_toolbox", "online_async_launch.py"],
-            "localization": ["ros2", "launch", "indoor_navigation", "localization.launch.py"],
-            "perception": ["ros2", "launch", "perception_system", "perception.launch.py"],
-            "safety_monitor": ["ros2", "run", "safety_monitor", "safety_monitor"],
-            "mission_planner": ["ros2", "run", "mission_planner", "mission_planner"],
-            "web_interface": ["ros2", "run", "web_interface", "web_server"]
-        }
-
-        if node_name not in launch_commands:
+        command = NODE_LAUNCH_COMMANDS.get(node_name)
+        if command is None:
             raise HTTPException(status_code=400, detail=f"Unknown node: {node_name}")
 
-        command = launch_commands[node_name]
-
-        # Start process in background
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        # Start process in background, in its own session so stop can signal the whole
+        # launch tree. Output is discarded, undrained pipes would stall a chatty node
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
             env=os.environ.copy()
         )
+        _launched_nodes[node_name] = process
 
         return {
             "status": "success",
@@ -299,27 +353,32 @@ async def stop_ros_node(node_name: str):
     Stop a specific ROS2 node
     """
     try:
-        import subprocess
-        import signal
-
-        # Get processes by name
-        result = subprocess.run(
-            ["pgrep", "-f", node_name],
-            capture_output=True,
-            text=True
-        )
+        # Nodes started through this API are stopped as one process group, no scan needed
+        process = _launched_nodes.pop(node_name, None)
+        if process is not None and process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+                return {
+                    "status": "success",
+                    "message": f"Stopped {node_name}",
+                    "killed_pids": [str(process.pid)]
+                }
+            except ProcessLookupError:
+                pass  # Group already gone, fall back to the scan
 
-        if result.returncode == 0:
-            pids = result.stdout.strip().split('\n')
+        # Scan /proc through psutil in the threadpool instead of forking pgrep
+        processes = await run_in_threadpool(_find_processes, node_name)
+
+        if processes:
             killed_pids = []
 
-            for pid in pids:
-                if pid:
-                    try:
-                        os.kill(int(pid), signal.SIGTERM)
-                        killed_pids.append(pid)
-                    except ProcessLookupError:
-                        pass  # Process already dead
+            for proc in processes:
+                try:
+                    # terminate() checks the PID was not reused since the scan
+                    proc.terminate()
+                    killed_pids.append(str(proc.pid))
+                except psutil.NoSuchProcess:
+                    pass  # Process already dead
 
             return {
                 "status": "success",
@@ -345,7 +404,6 @@ async def restart_ros_node(node_name: str):
         stop_result = await stop_ros_node(node_name)
 
         # Wait a moment
-        import asyncio
         await asyncio.sleep(2)
 
         # Start again
@@ -362,148 +420,64 @@ async def restart_ros_node(node_name: str):
         raise HTTPException(status_code=500, detail=f"Failed to restart {node_name}: {str(e)}")
 
 @router.get("/nodes/{node_name}/parameters")
-async def get_node_parameters(node_name: str):
+async def get_node_parameters(node_name: str, ros_bridge=Depends(require_ros_bridge)):
     """
-    Get parameters of a specific ROS2 node
+    Get parameters of a specific ROS node
     """
     try:
-        import subprocess
-        import yaml
-
-        # Get parameters using ros2 param list
-        result = subprocess.run(
-            ["ros2", "param", "list", f"/{node_name}"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        if result.returncode != 0:
+        # One parameter server call for the whole node namespace, off the event loop
+        values = await run_in_threadpool(ros_bridge.get_node_parameters, node_name)
+        
+        if values is None:
             raise HTTPException(status_code=404, detail=f"Node {node_name} not found or not responding")
-
-        param_names = result.stdout.strip().split('\n')
-        parameters = {}
-
-        # Get each parameter value
-        for param_name in param_names:
-            if param_name.strip():
-                try:
-                    param_result = subprocess.run(
-                        ["ros2", "param", "get", f"/{node_name}", param_name.strip()],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-
-                    if param_result.returncode == 0:
-                        # Parse parameter value
-                        param_output = param_result.stdout.strip()
-                        if param_output.startswith("Parameter name:"):
-                            lines = param_output.split('\n')
-                            if len(lines) >= 2:
-                                value_line = lines[1].strip()
-                                if value_line.startswith("Parameter value:"):
-                                    value = value_line.replace("Parameter value:", "").strip()
-                                    # Try to parse as YAML for proper type conversion
-                                    try:
-                                        parsed_value = yaml.safe_load(value)
-                                        parameters[param_name.strip()] = {
-                                            "value": parsed_value,
-                                            "type": type(parsed_value).__name__
-                                        }
-                                    except:
-                                        parameters[param_name.strip()] = {
-                                            "value": value,
-                                            "type": "string"
-                                        }
-                except subprocess.TimeoutExpired:
-                    parameters[param_name.strip()] = {
-                        "value": "timeout",
-                        "type": "error"
-                    }
-                except Exception as e:
-                    parameters[param_name.strip()] = {
-                        "value": str(e),
-                        "type": "error"
-                    }
-
+        
+        parameters = {
+            param_name: {
+                "value": value,
+                "type": type(value).__name__
+            }
+            for param_name, value in values.items()
+        }
+        
         return {
             "status": "success",
             "node": node_name,
             "parameters": parameters,
             "count": len(parameters)
         }
-
-    except subprocess.TimeoutExpired:
-        raise HTTPException(status_code=408, detail=f"Timeout getting parameters for {node_name}")
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get parameters for {node_name}: {str(e)}")
 
 @router.post("/nodes/{node_name}/parameters")
-async def set_node_parameters(node_name: str, parameters: dict):
+async def set_node_parameters(node_name: str, parameters: dict, ros_bridge=Depends(require_ros_bridge)):
     """
-    Set parameters of a specific ROS2 node
+    Set parameters of a specific ROS node
     """
     try:
-        import subprocess
-
+        # Accept both {"name": value} and {"name": {"value": value}}
+        values = {
+            param_name: param_data["value"] if isinstance(param_data, dict) and "value" in param_data else param_data
+            for param_name, param_data in parameters.items()
+        }
+        
+        # All parameters go to the master in one batched call
+        errors = await run_in_threadpool(ros_bridge.set_parameters_batch, node_name, values)
+        
         results = {}
-
-        for param_name, param_data in parameters.items():
-            try:
-                # Extract value from parameter data
-                if isinstance(param_data, dict) and "value" in param_data:
-                    param_value = param_data["value"]
-                else:
-                    param_value = param_data
-
-                # Convert value to string for ros2 param set
-                if isinstance(param_value, bool):
-                    value_str = "true" if param_value else "false"
-                elif isinstance(param_value, (int, float)):
-                    value_str = str(param_value)
-                elif isinstance(param_value, str):
-                    value_str = param_value
-                else:
-                    value_str = str(param_value)
-
-                # Set parameter using ros2 param set
-                result = subprocess.run(
-                    ["ros2", "param", "set", f"/{node_name}", param_name, value_str],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-
-                if result.returncode == 0:
-                    results[param_name] = {
-                        "status": "success",
-                        "message": "Parameter set successfully",
-                        "value": param_value
-                    }
-                else:
-                    results[param_name] = {
-                        "status": "error",
-                        "message": result.stderr.strip() or "Failed to set parameter",
-                        "value": param_value
-                    }
-
-            except subprocess.TimeoutExpired:
-                results[param_name] = {
-                    "status": "error",
-                    "message": "Timeout setting parameter",
-                    "value": param_value
-                }
-            except Exception as e:
-                results[param_name] = {
-                    "status": "error",
-                    "message": str(e),
-                    "value": param_value
-                }
-
+        for param_name, param_value in values.items():
+            error = errors.get(param_name)
+            results[param_name] = {
+                "status": "error" if error else "success",
+                "message": error or "Parameter set successfully",
+                "value": param_value
+            }
+        
         # Check if any parameters were successfully set
         success_count = sum(1 for r in results.values() if r["status"] == "success")
-
+        
         return {
             "status": "success" if success_count > 0 else "error",
             "node": node_name,
@@ -511,25 +485,26 @@ async def set_node_parameters(node_name: str, parameters: dict):
             "success_count": success_count,
             "total_count": len(parameters)
         }
-
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set parameters for {node_name}: {str(e)}")
 
-@router.get("/health")
+# Polled by probes, kept out of the OpenAPI schema. Everything comes from the sampler
+# snapshot and the bridge global, so it never waits on psutil, disk or ROS calls
+@router.get("/health", include_in_schema=False)
 async def health_check():
     """
     Comprehensive health check
     """
     try:
-        ros_bridge = get_ros_bridge()
-        
         # Check ROS2 connection
-        ros_healthy = ros_bridge is not None
+        ros_healthy = get_ros_bridge() is not None
         
         # Check system resources
-        cpu_percent = psutil.cpu_percent()
-        memory_percent = psutil.virtual_memory().percent
-        disk_percent = psutil.disk_usage('/').percent
+        snapshot = sampler.get()
+        cpu_percent = snapshot["cpu_percent"]
+        memory_percent = snapshot["memory"].percent
+        disk_percent = snapshot["disk"].percent
         
         # Health thresholds
         cpu_healthy = cpu_percent < 80
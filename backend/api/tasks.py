@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import json
+import orjson
 import os
+import sqlite3
+import threading
+import time
 import uuid
 from datetime import datetime
 import logging
@@ -13,7 +16,7 @@ import logging
 # Configure logging
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Data models
 class TaskAction(BaseModel):
@@ -46,46 +49,169 @@ class TaskSequenceUpdate(BaseModel):
     status: Optional[str] = None
     currentActionIndex: Optional[int] = None
 
-# Storage file path
+# Storage paths, tasks.json is only read once to migrate older installs
 TASKS_FILE = "data/tasks.json"
+TASKS_DB = "data/tasks.db"
 
-def ensure_data_directory():
-    """Ensure the data directory exists"""
-    os.makedirs(os.path.dirname(TASKS_FILE), exist_ok=True)
+_TASK_COLUMNS = "id, name, description, status, created, last_run, current_action_index, actions_json"
 
-def load_tasks() -> List[TaskSequence]:
-    """Load tasks from storage"""
-    ensure_data_directory()
+# Parsed tasks are reused for this long, writes through this module update them immediately
+TASKS_CACHE_TTL = 5.0
 
-    if not os.path.exists(TASKS_FILE):
-        return []
+_db: Optional[sqlite3.Connection] = None
+_db_lock = threading.Lock()
 
-    try:
-        with open(TASKS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return [TaskSequence(**item) for item in data]
-    except Exception as e:
-        logger.error(f"Error loading tasks: {e}")
-        return []
+# id -> task in rowid order, with its monotonic load time
+_tasks_cache: Optional[Dict[str, TaskSequence]] = None
+_tasks_cache_time = 0.0
+
+# GET /tasks body for the cached tasks, dropped whenever they change
+_tasks_bytes: Optional[bytes] = None
 
-def save_tasks(tasks: List[TaskSequence]):
-    """Save tasks to storage"""
-    ensure_data_directory()
+def ensure_data_directory():
+    """Ensure the data directory exists"""
+    os.makedirs(os.path.dirname(TASKS_DB), exist_ok=True)
+
+def get_db() -> sqlite3.Connection:
+    """Open the task database on first use, creating the schema"""
+    global _db
+    if _db is not None:
+        return _db
+
+    with _db_lock:
+        if _db is None:
+            ensure_data_directory()
+            db = sqlite3.connect(TASKS_DB, check_same_thread=False)
+            # WAL keeps readers off the writer's lock, NORMAL skips the fsync per commit
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS tasks ("
+                    "id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT NOT NULL, "
+                    "status TEXT NOT NULL, created TEXT NOT NULL, last_run TEXT, "
+                    "current_action_index INTEGER, actions_json TEXT NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)")
+                _migrate_tasks_file(db)
+            _db = db
+    return _db
+
+def _migrate_tasks_file(db: sqlite3.Connection):
+    """Import tasks.json into an empty database"""
+    if not os.path.exists(TASKS_FILE) or db.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+        return
 
     try:
-        with open(TASKS_FILE, 'w', encoding='utf-8') as f:
-            json.dump([task.dict() for task in tasks], f, indent=2, ensure_ascii=False)
+        with open(TASKS_FILE, 'rb') as f:
+            tasks = [TaskSequence(**item) for item in orjson.loads(f.read())]
     except Exception as e:
-        logger.error(f"Error saving tasks: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to save tasks: {str(e)}")
+        logger.error(f"Error migrating {TASKS_FILE}: {e}")
+        return
+
+    db.executemany(f"INSERT OR IGNORE INTO tasks ({_TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                   [_task_row(task) for task in tasks])
+    logger.info(f"Migrated {len(tasks)} tasks from {TASKS_FILE}")
+
+def _task_row(task: TaskSequence) -> tuple:
+    """Column values of a task, in _TASK_COLUMNS order"""
+    actions_json = orjson.dumps([action.model_dump() for action in task.actions]).decode()
+    return (task.id, task.name, task.description, task.status, task.created,
+            task.lastRun, task.currentActionIndex, actions_json)
+
+def _row_task(row: tuple) -> TaskSequence:
+    """Task from a row selected with _TASK_COLUMNS"""
+    task_id, name, description, status, created, last_run, current_action_index, actions_json = row
+    return TaskSequence(
+        id=task_id,
+        name=name,
+        description=description,
+        actions=orjson.loads(actions_json),
+        status=status,
+        created=created,
+        lastRun=last_run,
+        currentActionIndex=current_action_index
+    )
+
+def _cached_tasks() -> Dict[str, TaskSequence]:
+    """All tasks by ID, parsed again once TASKS_CACHE_TTL has passed"""
+    global _tasks_cache, _tasks_cache_time, _tasks_bytes
+    now = time.monotonic()
+    if _tasks_cache is None or now - _tasks_cache_time >= TASKS_CACHE_TTL:
+        rows = get_db().execute(f"SELECT {_TASK_COLUMNS} FROM tasks ORDER BY rowid").fetchall()
+        _tasks_cache = {row[0]: _row_task(row) for row in rows}
+        _tasks_cache_time = now
+        _tasks_bytes = None
+    return _tasks_cache
+
+def load_tasks_json() -> bytes:
+    """All tasks as a JSON array, serialized once per change"""
+    global _tasks_bytes
+    tasks = _cached_tasks()
+    if _tasks_bytes is None:
+        _tasks_bytes = orjson.dumps([task.model_dump() for task in tasks.values()])
+    return _tasks_bytes
 
-@router.get("/tasks", response_model=List[TaskSequence])
+def load_tasks() -> List[TaskSequence]:
+    """Load all tasks, oldest first (shared objects, do not modify)"""
+    return list(_cached_tasks().values())
+
+def load_task(task_id: str) -> Optional[TaskSequence]:
+    """Load one task by ID, None when it does not exist"""
+    task = _cached_tasks().get(task_id)
+    # Handlers assign fields before saving, keep that off the cached object
+    return task.model_copy() if task else None
+
+def load_running_task() -> Optional[TaskSequence]:
+    """Load the first task in the running state, if any"""
+    row = get_db().execute("SELECT id FROM tasks WHERE status = 'running' ORDER BY rowid LIMIT 1").fetchone()
+    return load_task(row[0]) if row else None
+
+def _invalidate_tasks_json():
+    global _tasks_bytes
+    _tasks_bytes = None
+
+def insert_task(task: TaskSequence):
+    """Store a new task"""
+    db = get_db()
+    with _db_lock, db:
+        db.execute(f"INSERT INTO tasks ({_TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _task_row(task))
+        if _tasks_cache is not None:
+            _tasks_cache[task.id] = task.model_copy()
+        _invalidate_tasks_json()
+
+def save_task(task: TaskSequence):
+    """Write back every field of an existing task"""
+    task_id, *values = _task_row(task)
+    db = get_db()
+    with _db_lock, db:
+        db.execute(
+            "UPDATE tasks SET name = ?, description = ?, status = ?, created = ?, last_run = ?, "
+            "current_action_index = ?, actions_json = ? WHERE id = ?",
+            (*values, task_id)
+        )
+        if _tasks_cache is not None:
+            _tasks_cache[task_id] = task.model_copy()
+        _invalidate_tasks_json()
+
+def remove_task(task_id: str) -> bool:
+    """Delete a task, False when it did not exist"""
+    db = get_db()
+    with _db_lock, db:
+        deleted = db.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+        if _tasks_cache is not None:
+            _tasks_cache.pop(task_id, None)
+        _invalidate_tasks_json()
+    return deleted
+
+# No response_model: the cached tasks were validated when stored, the body is reused as is
+@router.get("/tasks")
 async def get_tasks():
     """Get all task sequences"""
     try:
-        tasks = load_tasks()
-        logger.info(f"Retrieved {len(tasks)} tasks")
-        return tasks
+        body = load_tasks_json()
+        logger.info(f"Retrieved {len(_cached_tasks())} tasks")
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
         logger.error(f"Error retrieving tasks: {e}")
@@ -95,8 +221,6 @@ async def get_tasks():
 async def create_task(task_data: TaskSequenceCreate):
     """Create a new task sequence"""
     try:
-        tasks = load_tasks()
-
         # Create new task
         new_task = TaskSequence(
             id=str(uuid.uuid4()),
@@ -107,8 +231,7 @@ async def create_task(task_data: TaskSequenceCreate):
             created=datetime.now().isoformat()
         )
 
-        tasks.append(new_task)
-        save_tasks(tasks)
+        insert_task(new_task)
 
         logger.info(f"Created task: {new_task.name} with {len(new_task.actions)} actions")
         return new_task
@@ -121,8 +244,7 @@ async def create_task(task_data: TaskSequenceCreate):
 async def get_task(task_id: str):
     """Get a specific task sequence by ID"""
     try:
-        tasks = load_tasks()
-        task = next((t for t in tasks if t.id == task_id), None)
+        task = load_task(task_id)
 
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
@@ -139,20 +261,16 @@ async def get_task(task_id: str):
 async def update_task(task_id: str, task_data: TaskSequenceUpdate):
     """Update a task sequence"""
     try:
-        tasks = load_tasks()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        task = load_task(task_id)
 
-        if task_index is None:
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        # Update task
-        task = tasks[task_index]
-        update_data = task_data.dict(exclude_unset=True)
-
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        # Update task, copying the validated fields so actions stay TaskAction models
+        for field in task_data.model_fields_set:
+            setattr(task, field, getattr(task_data, field))
 
-        save_tasks(tasks)
+        save_task(task)
 
         logger.info(f"Updated task: {task.name}")
         return task
@@ -167,15 +285,11 @@ async def update_task(task_id: str, task_data: TaskSequenceUpdate):
 async def delete_task(task_id: str):
     """Delete a task sequence"""
     try:
-        tasks = load_tasks()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        deleted_task = load_task(task_id)
 
-        if task_index is None:
+        if deleted_task is None or not remove_task(task_id):
             raise HTTPException(status_code=404, detail="Task not found")
 
-        deleted_task = tasks.pop(task_index)
-        save_tasks(tasks)
-
         logger.info(f"Deleted task: {deleted_task.name}")
         return {"status": "success", "message": f"Deleted task: {deleted_task.name}"}
 
@@ -189,20 +303,17 @@ async def delete_task(task_id: str):
 async def execute_task(task_id: str):
     """Execute a task sequence"""
     try:
-        tasks = load_tasks()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        task = load_task(task_id)
 
-        if task_index is None:
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task = tasks[task_index]
-
         # Update task status to running
         task.status = "running"
         task.lastRun = datetime.now().isoformat()
         task.currentActionIndex = 0
 
-        save_tasks(tasks)
+        save_task(task)
 
         # TODO: Integrate with ROS to actually execute the task
         # This would involve sending commands to the robot based on the actions
@@ -224,19 +335,16 @@ async def execute_task(task_id: str):
 async def stop_task(task_id: str):
     """Stop executing a task sequence"""
     try:
-        tasks = load_tasks()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        task = load_task(task_id)
 
-        if task_index is None:
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task = tasks[task_index]
-
         # Update task status to idle
         task.status = "idle"
         task.currentActionIndex = None
 
-        save_tasks(tasks)
+        save_task(task)
 
         # TODO: Integrate with ROS to actually stop the robot
         logger.info(f"Stopped executing task: {task.name}")
@@ -257,8 +365,7 @@ async def stop_task(task_id: str):
 async def get_running_task():
     """Get the currently running task (if any)"""
     try:
-        tasks = load_tasks()
-        running_task = next((t for t in tasks if t.status == "running"), None)
+        running_task = load_running_task()
 
         return running_task
 
@@ -270,14 +377,11 @@ async def get_running_task():
 async def update_task_progress(task_id: str, action_index: int):
     """Update the current action index for a running task"""
     try:
-        tasks = load_tasks()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        task = load_task(task_id)
 
-        if task_index is None:
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task = tasks[task_index]
-
         if task.status != "running":
             raise HTTPException(status_code=400, detail="Task is not currently running")
 
@@ -291,7 +395,7 @@ async def update_task_progress(task_id: str, action_index: int):
             task.status = "completed"
             task.currentActionIndex = None
 
-        save_tasks(tasks)
+        save_task(task)
 
         logger.info(f"Updated progress for task {task.name}: action {action_index}")
         return {
@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 import uvicorn
 import json
 import asyncio
@@ -99,7 +99,8 @@ def safe_json_dumps(obj):
 app = FastAPI(
     title="Indoor Autonomous Vehicle Web Interface",
     description="Web interface for controlling and monitoring indoor autonomous vehicle",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Security middleware
@@ -126,6 +127,12 @@ app.add_middleware(
 # Rate limiting middleware
 app.middleware("http")(rate_limit_middleware)
 
+# Errors not handled by a route are returned as a JSON 500
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Unhandled error on {request.url.path}: {exc}")
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
+
 # WebSocket manager (only if available)
 if WEBSOCKET_AVAILABLE:
     websocket_manager = WebSocketManager()
@@ -472,5 +479,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
@@ -16,7 +16,7 @@ from typing import Dict, Any
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +27,7 @@ app = FastAPI(
     title="Indoor Autonomous Vehicle API - Remote Mode",
     description="Minimal backend for remote ROS bridge connections",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -520,5 +521,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
@@ -19,13 +19,15 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+import orjson
 import yaml
 
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 
 # Add the parent directory to Python path for imports
@@ -38,7 +40,7 @@ from ros_bridge.ros_interface_noetic import get_ros_bridge, init_ros_bridge, shu
 from api.robot_control import router as robot_router
 from api.navigation import router as navigation_router
 from api.sensors import router as sensors_router
-from api.system import router as system_router
+from api.system import router as system_router, prime_ros_process_cpu
 from api.parameters import router as parameters_router
 from api.logs import router as logs_router
 from api.auth import router as auth_router
@@ -51,6 +53,7 @@ from websocket.websocket_manager import WebSocketManager
 from terminal.terminal_manager import handle_terminal_websocket
 from middleware.rate_limit import rate_limit_middleware
 from services.system_monitor import init_system_monitor, get_system_monitor
+from services import sampler
 
 # Configure logging với format rõ ràng và force output
 logging.basicConfig(
@@ -87,6 +90,7 @@ app = FastAPI(
     title="Indoor Autonomous Vehicle API - ROS Noetic",
     description="Web interface backend for indoor autonomous vehicle using ROS Noetic",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan
@@ -104,6 +108,12 @@ app.add_middleware(
 # Add rate limiting middleware
 app.middleware("http")(rate_limit_middleware)
 
+# Errors not handled by a route are returned as a JSON 500
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Unhandled error on {request.url.path}: {exc}")
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
+
 # Initialize WebSocket manager
 websocket_manager = WebSocketManager()
 
@@ -134,6 +144,10 @@ if frontend_path.exists() and (frontend_path / "static").exists():
 
 async def startup_event():
     """Initialize ROS Noetic bridge on startup"""
+    # System metrics for /api/system, independent of the ROS connection
+    await sampler.start()
+    prime_ros_process_cpu()
+    
     try:
         logger.info("Initializing ROS Noetic bridge...")
         
@@ -202,6 +216,11 @@ async def shutdown_event():
     system_monitor = get_system_monitor()
     if system_monitor:
         await system_monitor.stop()
+    
+    await sampler.stop()
+
+    # Persist task progress that is still waiting for its debounced write
+    await flush_task_updates()
 
     # Shutdown ROS bridge
     shutdown_ros_bridge()
@@ -403,7 +422,7 @@ async def clear_frontend_logs():
         logger.error(f"Error clearing frontend logs: {e}")
         return {"status": "error", "message": str(e)}
 
-@app.get("/health")
+@app.get("/health", include_in_schema=False)
 async def health_check():
     """Health check endpoint"""
     try:
@@ -462,7 +481,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
 
 # Switch System API Endpoints - Global state
@@ -904,7 +925,7 @@ async def save_current_map_to_list(request: Request):
 # ============================================================================
 
 # ROS1 Maps data models
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 import uuid
 import json
 
@@ -1052,6 +1073,11 @@ TASKS_FILE = WORKSPACE_ROOT / "data" / "tasks.json"
 TASKS_FILE.parent.mkdir(parents=True, exist_ok=True)
 tasks_lock = asyncio.Lock()
 
+# update-progress changes are held in memory and written together after this delay (seconds)
+TASK_PROGRESS_FLUSH_DELAY = 0.3
+_pending_task_updates: Dict[str, 'TaskSequenceModel'] = {}
+_task_flush_task: Optional[asyncio.Task] = None
+
 
 class TaskActionModel(BaseModel):
     id: str
@@ -1095,39 +1121,84 @@ class TaskSequenceUpdateModel(BaseModel):
 TaskActionModel.update_forward_refs()
 TaskSequenceModel.update_forward_refs()
 
+_TASK_LIST_ADAPTER = TypeAdapter(List[TaskSequenceModel])
+
 
-def load_task_sequences() -> List[TaskSequenceModel]:
+def load_task_sequences() -> Dict[str, TaskSequenceModel]:
+    """Tasks by id, in file order, so handlers look a task up instead of scanning"""
     if not TASKS_FILE.exists():
-        return []
+        return {}
 
     try:
-        with TASKS_FILE.open('r', encoding='utf-8') as f:
-            data = json.load(f)
-            tasks: List[TaskSequenceModel] = []
-            for item in data:
-                if isinstance(item, dict):
-                    if 'mapId' not in item and 'map_id' in item:
-                        item['mapId'] = item.get('map_id')
-                    tasks.append(TaskSequenceModel(**item))
-            return tasks
+        data = orjson.loads(TASKS_FILE.read_bytes())
+        items = []
+        for item in data:
+            if isinstance(item, dict):
+                if 'mapId' not in item and 'map_id' in item:
+                    item['mapId'] = item.get('map_id')
+                items.append(item)
+        # One validation pass over the whole list instead of a model call per task
+        tasks = {task.id: task for task in _TASK_LIST_ADAPTER.validate_python(items)}
     except Exception as error:
         logger.error(f"Error loading tasks: {error}")
-        return []
+        return {}
+
+    # Progress that has not been flushed yet is newer than the file
+    for task_id, task in _pending_task_updates.items():
+        if task_id in tasks:
+            tasks[task_id] = task
+    return tasks
+
 
+def write_file_atomic(path: Path, payload: bytes):
+    """Write to a temp file next to path and rename it over, readers never see half a file"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with tmp_path.open('wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
 
-def save_task_sequences(tasks: List[TaskSequenceModel]):
-    serialized: List[Dict[str, Any]] = []
-    for task in tasks:
-        task_dict = task.dict()
-        serialized.append(task_dict)
+
+async def save_task_sequences(tasks: Dict[str, TaskSequenceModel]):
+    serialized = [task.model_dump() for task in tasks.values()]
 
     try:
-        with TASKS_FILE.open('w', encoding='utf-8') as f:
-            json.dump(serialized, f, indent=2, ensure_ascii=False)
+        # orjson writes UTF-8 bytes directly, non-ASCII names stay readable
+        payload = orjson.dumps(serialized, option=orjson.OPT_INDENT_2)
+        # Disk I/O and fsync run in the threadpool, not on the event loop
+        await run_in_threadpool(write_file_atomic, TASKS_FILE, payload)
     except Exception as error:
         logger.error(f"Error saving tasks: {error}")
         raise HTTPException(status_code=500, detail=f"Failed to save tasks: {error}")
 
+    # Every save writes the loaded tasks, pending progress included
+    _pending_task_updates.clear()
+
+
+async def flush_task_updates():
+    """Write pending update-progress changes to tasks.json"""
+    async with tasks_lock:
+        if _pending_task_updates:
+            await save_task_sequences(load_task_sequences())
+
+
+async def _flush_task_updates_later():
+    global _task_flush_task
+    await asyncio.sleep(TASK_PROGRESS_FLUSH_DELAY)
+    # Updates arriving while this flush runs schedule the next one
+    _task_flush_task = None
+    try:
+        await flush_task_updates()
+    except Exception as error:
+        logger.error(f"[Tasks] Failed to flush task progress: {error}")
+
+
+def schedule_task_flush():
+    global _task_flush_task
+    if _task_flush_task is None:
+        _task_flush_task = asyncio.create_task(_flush_task_updates_later())
+
 
 def read_active_map_metadata() -> Optional[Dict[str, Any]]:
     if not ACTIVE_MAP_FILE.exists():
@@ -2142,7 +2213,7 @@ def get_line_points_simple(x0: int, y0: int, x1: int, y1: int) -> list:
 @app.get("/api/tasks", response_model=List[TaskSequenceModel])
 async def api_get_tasks():
     async with tasks_lock:
-        return load_task_sequences()
+        return list(load_task_sequences().values())
 
 
 @app.post("/api/tasks", response_model=TaskSequenceModel)
@@ -2159,8 +2230,8 @@ async def api_create_task(task_data: TaskSequenceCreateModel):
 
     async with tasks_lock:
         tasks = load_task_sequences()
-        tasks.append(new_task)
-        save_task_sequences(tasks)
+        tasks[new_task.id] = new_task
+        await save_task_sequences(tasks)
 
     logger.info(f"[Tasks] Created task '{new_task.name}' with {len(new_task.actions)} actions")
     return new_task
@@ -2171,7 +2242,7 @@ async def api_get_task(task_id: str):
     async with tasks_lock:
         tasks = load_task_sequences()
 
-    task = next((t for t in tasks if t.id == task_id), None)
+    task = tasks.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -2184,12 +2255,10 @@ async def api_update_task(task_id: str, update_data: TaskSequenceUpdateModel):
 
     async with tasks_lock:
         tasks = load_task_sequences()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
-        if task_index is None:
+        task = tasks.get(task_id)
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task = tasks[task_index]
-
         for field, value in update_payload.items():
             if field == 'actions' and value is not None:
                 parsed_actions = []
@@ -2202,8 +2271,7 @@ async def api_update_task(task_id: str, update_data: TaskSequenceUpdateModel):
             else:
                 setattr(task, field, value)
 
-        tasks[task_index] = task
-        save_task_sequences(tasks)
+        await save_task_sequences(tasks)
 
     logger.info(f"[Tasks] Updated task '{task.name}'")
     return task
@@ -2213,12 +2281,10 @@ async def api_update_task(task_id: str, update_data: TaskSequenceUpdateModel):
 async def api_delete_task(task_id: str):
     async with tasks_lock:
         tasks = load_task_sequences()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
-        if task_index is None:
+        deleted_task = tasks.pop(task_id, None)
+        if deleted_task is None:
             raise HTTPException(status_code=404, detail="Task not found")
-
-        deleted_task = tasks.pop(task_index)
-        save_task_sequences(tasks)
+        await save_task_sequences(tasks)
 
     logger.info(f"[Tasks] Deleted task '{deleted_task.name}'")
     return {"status": "success", "message": f"Deleted task: {deleted_task.name}"}
@@ -2229,7 +2295,7 @@ async def api_execute_task(task_id: str):
     async with tasks_lock:
         tasks = load_task_sequences()
 
-    task = next((t for t in tasks if t.id == task_id), None)
+    task = tasks.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -2292,16 +2358,13 @@ async def api_execute_task(task_id: str):
 
     async with tasks_lock:
         tasks = load_task_sequences()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
-        if task_index is None:
+        task = tasks.get(task_id)
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
-
-        task = tasks[task_index]
         task.status = "running"
         task.lastRun = datetime.now().isoformat()
         task.currentActionIndex = 0
-        tasks[task_index] = task
-        save_task_sequences(tasks)
+        await save_task_sequences(tasks)
 
     logger.info(f"[Tasks] Started executing task '{task.name}'")
     return {
@@ -2315,16 +2378,13 @@ async def api_execute_task(task_id: str):
 async def api_stop_task(task_id: str):
     async with tasks_lock:
         tasks = load_task_sequences()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        task = tasks.get(task_id)
 
-        if task_index is None:
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
-
-        task = tasks[task_index]
         task.status = "idle"
         task.currentActionIndex = None
-        tasks[task_index] = task
-        save_task_sequences(tasks)
+        await save_task_sequences(tasks)
 
     logger.info(f"[Tasks] Stopped task '{task.name}'")
     return {
@@ -2339,20 +2399,18 @@ async def api_get_running_task():
     async with tasks_lock:
         tasks = load_task_sequences()
 
-    return next((t for t in tasks if t.status == "running"), None)
+    return next((t for t in tasks.values() if t.status == "running"), None)
 
 
 @app.post("/api/tasks/{task_id}/update-progress")
 async def api_update_task_progress(task_id: str, action_index: int):
     async with tasks_lock:
         tasks = load_task_sequences()
-        task_index = next((i for i, t in enumerate(tasks) if t.id == task_id), None)
+        task = tasks.get(task_id)
 
-        if task_index is None:
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task = tasks[task_index]
-
         if task.status != "running":
             raise HTTPException(status_code=400, detail="Task is not currently running")
 
@@ -2365,8 +2423,9 @@ async def api_update_task_progress(task_id: str, action_index: int):
             task.status = "completed"
             task.currentActionIndex = None
 
-        tasks[task_index] = task
-        save_task_sequences(tasks)
+        # Fast action sequences post progress back to back, coalesce them into one write
+        _pending_task_updates[task_id] = task
+        schedule_task_flush()
 
     logger.info(f"[Tasks] Updated progress for task '{task.name}' -> action {action_index}")
     return {
@@ -18,7 +18,7 @@ import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
 # Add the parent directory to Python path for imports
 sys.path.append(str(Path(__file__).parent.parent))
@@ -27,7 +27,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from api.robot_control import router as robot_router
 from api.navigation import router as navigation_router
 from api.sensors import router as sensors_router
-from api.system import router as system_router
+from api.system import router as system_router, prime_ros_process_cpu
 from api.parameters import router as parameters_router
 from api.logs import router as logs_router
 from api.auth import router as auth_router
@@ -41,6 +41,7 @@ from websocket.websocket_manager import WebSocketManager
 from terminal.terminal_manager import handle_terminal_websocket
 from middleware.rate_limit import rate_limit_middleware
 from services.system_monitor import init_system_monitor, get_system_monitor
+from services import sampler
 
 # Configure logging
 logging.basicConfig(
@@ -57,6 +58,7 @@ app = FastAPI(
     title="Indoor Autonomous Vehicle API - Standalone",
     description="Web interface backend for indoor autonomous vehicle (Backend-only testing mode)",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -73,6 +75,12 @@ app.add_middleware(
 # Add rate limiting middleware
 app.middleware("http")(rate_limit_middleware)
 
+# Errors not handled by a route are returned as a JSON 500
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Unhandled error on {request.url.path}: {exc}")
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
+
 # Initialize WebSocket manager
 websocket_manager = WebSocketManager()
 
@@ -121,6 +129,10 @@ if frontend_path.exists() and (frontend_path / "static").exists():
 @app.on_event("startup")
 async def startup_event():
     """Initialize backend in standalone mode (no ROS)"""
+    # System metrics for /api/system
+    await sampler.start()
+    prime_ros_process_cpu()
+    
     try:
         logger.info("Starting backend in standalone mode (no ROS connection)")
         logger.info("This mode is for backend testing only")
@@ -142,6 +154,8 @@ async def shutdown_event():
     system_monitor = get_system_monitor()
     if system_monitor:
         await system_monitor.stop()
+    
+    await sampler.stop()
 
     await websocket_manager.disconnect_all()
     logger.info("Shutdown complete")
@@ -449,5 +463,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -9,13 +9,17 @@ Compatible with the existing backend API but uses ROS1 instead of ROS2
 import rospy
 import threading
 import json
+import math
 import time
 import subprocess
+import itertools
+from collections import deque
 import os
 import logging
 import sys
+import xmlrpc.client
 from threading import Lock
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 from pathlib import Path
 
 # Configure Python logging to work alongside rospy
@@ -35,8 +39,21 @@ from nav_msgs.msg import Odometry, OccupancyGrid
 from geometry_msgs.msg import Twist, PoseStamped, PoseWithCovarianceStamped
 from diagnostic_msgs.msg import DiagnosticArray
 import genpy
+import rosgraph
 import rostopic
 
+# Log entries kept by the bridge, older ones drop off
+LOG_CAP = 1000
+
+# Initial pose covariance: 0.25 on x and y, 0.068 on theta, zero elsewhere
+INITIAL_POSE_COVARIANCE = tuple(
+    {0: 0.25, 7: 0.25, 35: 0.068}.get(index, 0.0) for index in range(36)
+)
+
+def _snapshot(data):
+    """Logs are a deque internally, callers get a plain list"""
+    return list(data) if isinstance(data, deque) else data
+
 class ROS1WebBridge:
     """
     ROS1 Web Bridge - Bridge between ROS Noetic and Web Interface
@@ -64,7 +81,7 @@ class ROS1WebBridge:
             'battery': None,
             'map': None,
             'diagnostics': None,
-            'logs': [],
+            'logs': deque(maxlen=LOG_CAP),
             'node_status': {},
             'ultrasonic': {}
         }
@@ -94,12 +111,15 @@ class ROS1WebBridge:
     
     def init_subscribers(self):
         """Initialize ROS1 subscribers"""
+        # Telemetry streams only keep the latest message: skip Nagle batching
+        # on the TCPROS link and drop stale messages instead of queueing them
         # Robot pose (AMCL)
         self.amcl_sub = rospy.Subscriber(
             '/amcl_pose',
             PoseWithCovarianceStamped,
             self.amcl_pose_callback,
-            queue_size=10
+            queue_size=1,
+            tcp_nodelay=True
         )
 
         # Odometry
@@ -107,7 +127,8 @@ class ROS1WebBridge:
             '/odom_from_laser',
             Odometry,
             self.odom_callback,
-            queue_size=10
+            queue_size=1,
+            tcp_nodelay=True
         )
 
         # LiDAR scan
@@ -115,7 +136,8 @@ class ROS1WebBridge:
             '/scan_forward',
             LaserScan,
             self.scan_callback,
-            queue_size=5
+            queue_size=1,
+            tcp_nodelay=True
         )
 
         self.battery_sub = rospy.Subscriber(
@@ -459,12 +481,26 @@ class ROS1WebBridge:
     def get_latest_data(self, data_type: str) -> Optional[Dict[str, Any]]:
         """Get latest data for specified type"""
         with self.data_lock:
-            return self.latest_data.get(data_type)
+            return _snapshot(self.latest_data.get(data_type))
+    
+    def get_latest_bulk(self, data_types: List[str]) -> Dict[str, Any]:
+        """Get latest data for several types under a single lock acquisition"""
+        with self.data_lock:
+            return {data_type: _snapshot(self.latest_data.get(data_type)) for data_type in data_types}
     
     def get_all_latest_data(self) -> Dict[str, Any]:
         """Get all latest data"""
         with self.data_lock:
-            return self.latest_data.copy()
+            return {data_type: _snapshot(data) for data_type, data in self.latest_data.items()}
+    
+    def get_recent(self, data_type: str, limit: int):
+        """(last limit entries, total stored) of a list-like data type, copying only the tail"""
+        with self.data_lock:
+            entries = self.latest_data.get(data_type)
+            if entries is None:
+                return None, 0
+            total = len(entries)
+            return list(itertools.islice(entries, max(0, total - limit), None)), total
 
     def refresh_map_subscription(self):
         """Refresh map subscription to force new map data"""
@@ -586,18 +622,15 @@ class ROS1WebBridge:
         msg.pose.pose.position.y = float(y)
         msg.pose.pose.position.z = 0.0
         
-        # Convert theta to quaternion
-        import math
+        # Convert theta to quaternion (yaw only, so x and y stay zero)
+        half_theta = theta / 2.0
         msg.pose.pose.orientation.x = 0.0
         msg.pose.pose.orientation.y = 0.0
-        msg.pose.pose.orientation.z = math.sin(theta / 2.0)
-        msg.pose.pose.orientation.w = math.cos(theta / 2.0)
+        msg.pose.pose.orientation.z = math.sin(half_theta)
+        msg.pose.pose.orientation.w = math.cos(half_theta)
         
         # Set covariance
-        msg.pose.covariance = [0.0] * 36
-        msg.pose.covariance[0] = 0.25   # x
-        msg.pose.covariance[7] = 0.25   # y
-        msg.pose.covariance[35] = 0.068 # theta
+        msg.pose.covariance = INITIAL_POSE_COVARIANCE
         
         self.initial_pose_pub.publish(msg)
         rospy.loginfo(f'Initial pose published: ({x}, {y}, {theta})')
@@ -689,6 +722,65 @@ class ROS1WebBridge:
             "running_mode": self.running_mode,
             "current_map_topic": self.current_map_topic
         }
+    
+    def get_node_parameters(self, node_name: str) -> Optional[Dict[str, Any]]:
+        """Get a node's parameters as name -> value, None when it has none"""
+        # The whole namespace comes back as one tree from a single parameter server call
+        try:
+            tree = rospy.get_param(f"/{node_name.strip('/')}")
+        except KeyError:
+            return None
+        if not isinstance(tree, dict):
+            return None
+        
+        parameters = {}
+        pending = [("", tree)]
+        while pending:
+            prefix, subtree = pending.pop()
+            for key, value in subtree.items():
+                if isinstance(value, dict) and value:
+                    pending.append((f"{prefix}{key}/", value))
+                else:
+                    parameters[f"{prefix}{key}"] = value
+        return parameters
+    
+    def set_parameters_batch(self, node_name: str, parameters: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        """
+        Set several parameters of a node in one master round trip, error message (or None) per name.
+        The calls go to the master's XML-RPC API directly rather than through rospy.set_param,
+        the master still notifies paramUpdate subscribers so rospy.get_param_cached stays current
+        """
+        namespace = f"/{node_name.strip('/')}"
+        caller_id = rospy.get_name()
+        multicall = xmlrpc.client.MultiCall(xmlrpc.client.ServerProxy(rosgraph.get_master_uri()))
+        errors = {}
+        queued = []
+        for param_name, value in parameters.items():
+            # One value XML-RPC cannot encode (None, ints beyond 32 bits) would fail the whole batch
+            try:
+                xmlrpc.client.dumps((value,))
+            except (TypeError, OverflowError) as e:
+                errors[param_name] = f"Unsupported parameter value: {e}"
+                continue
+            multicall.setParam(caller_id, f"{namespace}/{param_name.strip('/')}", value)
+            queued.append(param_name)
+        
+        if not queued:
+            return errors
+        
+        outcomes = multicall()
+        for index, param_name in enumerate(queued):
+            try:
+                code, message, _ = outcomes[index]
+                errors[param_name] = None if code == 1 else message
+            except xmlrpc.client.Fault as e:
+                errors[param_name] = e.faultString
+        return errors
+    
+    def set_node_parameters(self, node_name: str, parameters: Dict[str, Any]) -> bool:
+        """Set several parameters of a node, True when all of them were set"""
+        errors = self.set_parameters_batch(node_name, parameters)
+        return not any(errors.values())
 
 # Global bridge instance
 ros_bridge = None
@@ -2,8 +2,10 @@
 
 import jwt
 import hashlib
+import hmac
 import secrets
 import time
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, Depends, status
@@ -18,6 +20,8 @@ SECRET_KEY = secrets.token_urlsafe(32)  # In production, use environment variabl
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+TOKEN_CACHE_TTL_SECONDS = 5
+TOKEN_CACHE_MAX_SIZE = 10000
 
 # Security scheme
 security = HTTPBearer()
@@ -71,6 +75,10 @@ users_db: Dict[str, Dict[str, Any]] = {
 # Active sessions
 active_sessions: Dict[str, Dict[str, Any]] = {}
 
+# Recently verified token claims, keyed by a 16-byte BLAKE2b digest of the raw token
+_token_cache: Dict[bytes, tuple] = {}
+_token_cache_lock = threading.Lock()
+
 def hash_password(password: str) -> str:
     """Hash password with salt"""
     salt = secrets.token_hex(16)
@@ -84,10 +92,10 @@ def verify_password(password: str, password_hash: str) -> bool:
             # New format with salt
             salt, hash_hex = password_hash.split(":", 1)
             expected_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return hash_hex == expected_hash.hex()
+            return hmac.compare_digest(hash_hex, expected_hash.hex())
         else:
             # Legacy format (simple SHA256)
-            return password_hash == hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(password_hash, hashlib.sha256(password.encode()).hexdigest())
     except Exception:
         return False
 
@@ -141,6 +149,47 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     except jwt.PyJWTError:
         return None
 
+def _token_cache_key(token: str) -> bytes:
+    """Derive a 16-byte token cache key"""
+    # 128 bits is ample for a process-local cache; blake2b is stdlib and faster than sha256 in software
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def verify_token_cached(token: str) -> Optional[Dict[str, Any]]:
+    """Verify JWT token, reusing claims verified within the last few seconds"""
+    key = _token_cache_key(token)
+    now = time.time()
+
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            payload, cached_until = entry
+            if now < cached_until:
+                return payload
+            del _token_cache[key]
+
+    payload = verify_token(token)
+    if payload is None:
+        return None
+
+    # Never cache past token expiry
+    cached_until = min(now + TOKEN_CACHE_TTL_SECONDS, payload.get("exp", now))
+
+    with _token_cache_lock:
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            expired = [k for k, (_, until) in _token_cache.items() if until <= now]
+            for k in expired:
+                del _token_cache[k]
+            if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+                del _token_cache[next(iter(_token_cache))]
+        _token_cache[key] = (payload, cached_until)
+
+    return payload
+
+def invalidate_cached_token(token: str):
+    """Drop token from the verified claims cache"""
+    with _token_cache_lock:
+        _token_cache.pop(_token_cache_key(token), None)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -150,7 +199,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     try:
-        payload = verify_token(credentials.credentials)
+        payload = verify_token_cached(credentials.credentials)
         if payload is None:
             raise credentials_exception
         
@@ -257,6 +306,8 @@ def refresh_access_token(refresh_token: str) -> Optional[str]:
 def logout_user(token: str) -> bool:
     """Logout user and invalidate session"""
     try:
+        invalidate_cached_token(token)
+
         payload = verify_token(token)
         if not payload:
             return False
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+import psutil
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often the background loop refreshes the snapshot (seconds)
+SAMPLE_INTERVAL = 2.0
+
+# Latest psutil readings, replaced as a whole on every refresh
+_snapshot: Dict[str, Any] = {}
+_sampler_task: Optional[asyncio.Task] = None
+
+# cpu_percent(interval=None) measures since the previous call, prime it once.
+# Everything else reads CPU through get() so nothing resets this baseline
+psutil.cpu_percent(interval=None)
+
+def _sample() -> Dict[str, Any]:
+    """One round of non-blocking psutil readings"""
+    return {
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "memory": psutil.virtual_memory(),
+        "disk": psutil.disk_usage('/'),
+        "network_io": psutil.net_io_counters(),
+        "disk_io": psutil.disk_io_counters(),
+        "timestamp": time.time()
+    }
+
+async def _loop():
+    """Refresh the snapshot every SAMPLE_INTERVAL seconds"""
+    global _snapshot
+    try:
+        while True:
+            # Sleep first, a sample right after priming would read 0% CPU
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            try:
+                _snapshot = _sample()
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+    except asyncio.CancelledError:
+        logger.info("System sampler loop cancelled")
+
+def get() -> Dict[str, Any]:
+    """
+    Latest snapshot, sampled on the spot when it is older than SAMPLE_INTERVAL,
+    which keeps apps that never start the loop current
+    """
+    global _snapshot
+    if not _snapshot or time.time() - _snapshot["timestamp"] > SAMPLE_INTERVAL:
+        _snapshot = _sample()
+    return _snapshot
+
+async def start():
+    """Start the background sampler"""
+    global _sampler_task
+    if _sampler_task is not None and not _sampler_task.done():
+        return
+    
+    _sampler_task = asyncio.create_task(_loop())
+    logger.info("System sampler started")
+
+async def stop():
+    """Stop the background sampler"""
+    global _sampler_task
+    if _sampler_task is None:
+        return
+    
+    _sampler_task.cancel()
+    try:
+        await _sampler_task
+    except asyncio.CancelledError:
+        pass
+    _sampler_task = None
+    logger.info("System sampler stopped")
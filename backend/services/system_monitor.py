@@ -6,6 +6,7 @@ import psutil
 import logging
 from typing import Dict, Any, Optional
 from websocket.websocket_manager import WebSocketManager
+from services import sampler
 
 logger = logging.getLogger(__name__)
 
@@ -66,10 +67,11 @@ class SystemMonitor:
     async def _collect_and_broadcast_metrics(self):
         """Collect and broadcast system metrics"""
         try:
-            # CPU and Memory
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            # CPU and Memory, from the shared sampler instead of blocking the loop for 0.1s
+            snapshot = sampler.get()
+            cpu_percent = snapshot["cpu_percent"]
+            memory = snapshot["memory"]
+            disk = snapshot["disk"]
             
             # System info
             boot_time = psutil.boot_time()
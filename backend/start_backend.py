@@ -75,6 +75,8 @@ def start_backend():
             "main:app",
             "--host", "0.0.0.0",
             "--port", "8000",
+            "--loop", "uvloop",
+            "--http", "httptools",
             "--reload",
             "--log-level", "info"
         ])
@@ -10,6 +10,9 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Clients sent to concurrently before yielding back to the event loop
+SEND_BATCH_SIZE = 50
+
 def safe_json_dumps(obj):
     """JSON dumps that handles NaN and Infinity values"""
     def convert_nan_inf(obj):
@@ -173,6 +176,23 @@ class WebSocketManager:
         
         logger.info(f"Client unsubscribed from: {topics}")
     
+    async def _send_batched(self, websockets: List[WebSocket], text: str, action: str):
+        """Send one serialized message to many clients, a batch at a time"""
+        for start in range(0, len(websockets), SEND_BATCH_SIZE):
+            batch = websockets[start:start + SEND_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(websocket.send_text(text) for websocket in batch),
+                return_exceptions=True
+            )
+            
+            for websocket, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error {action}: {str(result)}")
+                    self.disconnect(websocket)
+            
+            # Let other tasks run between batches
+            await asyncio.sleep(0)
+    
     # Specific broadcast methods for different data types
     
     async def broadcast_pose(self, data_type: str, data: Dict[str, Any]):
@@ -187,9 +207,10 @@ class WebSocketManager:
         """Broadcast LiDAR scan data"""
         # Reduce data size for web transmission
         if 'ranges' in data:
-            # Sample every 4th point to reduce bandwidth
+            # Sample every 4th point to reduce bandwidth, on a copy: data is the
+            # bridge's stored scan, which /sensors/scan keeps serving in full
             ranges = data['ranges']
-            data['ranges'] = ranges[::4] if len(ranges) > 360 else ranges
+            data = {**data, 'ranges': ranges[::4] if len(ranges) > 360 else ranges}
         
         await self.broadcast('scan', data)
     
@@ -242,12 +263,8 @@ class WebSocketManager:
             'timestamp': time.time()
         }
 
-        for websocket in self.active_connections:
-            try:
-                await websocket.send_text(safe_json_dumps(message))
-            except Exception as e:
-                logger.error(f"Error broadcasting switch state: {str(e)}")
-                self.disconnect(websocket)
+        # Serialize once for every client, iterate a snapshot since failed clients are removed
+        await self._send_batched(list(self.active_connections), safe_json_dumps(message), "broadcasting switch state")
 
     async def broadcast_system_status(self, status_data: Dict[str, Any]):
         """Broadcast overall system status including switch states"""
@@ -257,12 +274,7 @@ class WebSocketManager:
             'timestamp': time.time()
         }
 
-        for websocket in self.active_connections:
-            try:
-                await websocket.send_text(safe_json_dumps(message))
-            except Exception as e:
-                logger.error(f"Error broadcasting system status: {str(e)}")
-                self.disconnect(websocket)
+        await self._send_batched(list(self.active_connections), safe_json_dumps(message), "broadcasting system status")
 
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get WebSocket connection statistics"""